@@ -1,24 +1,24 @@
 import pygame
-from collections import deque
 import numpy as np
 
+from cache_solutions import SolutionCache
+from indices import HINT_ABANDONED, HintEngine
+from moteur import DIRECTIONS, SOLVERS, Board, Game, SolverJob
+from niveaux import levels
+from scores import LEGACY_FILE, SCORES_DB, ScoreStore
+from collection_niveaux import LevelCollection
+
 
 import json
 import os
-from datetime import datetime
-
-# Fichier de sauvegarde des scores
-SCORES_FILE = "scores.txt"
-
-
-pygame.init()
-pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+import sys
 
 SIZE = 40
 WINDOW_WIDTH = 480  # Agrandi pour des niveaux plus larges
 WINDOW_HEIGHT = 580  # Agrandi pour des niveaux plus hauts
-screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-pygame.display.set_caption("Sokoban BFS")
+
+# Images par seconde au maximum (variable d'environnement SOKOBAN_FPS)
+FPS = int(os.environ.get("SOKOBAN_FPS", "30"))
 
 # États du jeu
 MENU = "menu"
@@ -57,7 +57,34 @@ player_name = ""
 input_active = False
 selected_algorithm = "BFS"  # NOUVEAU - par défaut BFS
 
+# Algorithmes proposés dans le menu, dans l'ordre d'affichage
+ALGORITHMS = ["BFS", "DFS", "A*", "BIDIR", "ANYTIME"]
 
+# Touches de déplacement du joueur
+ARROW_MOVES = {
+    pygame.K_UP: (0, -1),
+    pygame.K_DOWN: (0, 1),
+    pygame.K_LEFT: (-1, 0),
+    pygame.K_RIGHT: (1, 0),
+}
+
+# Nom de chaque direction, pour afficher les indices
+MOVE_NAMES = {(0, -1): "haut", (0, 1): "bas", (-1, 0): "gauche", (1, 0): "droite"}
+HINT_TEXTS = dict(MOVE_NAMES, **{HINT_ABANDONED: "indice indisponible"})
+
+# Titre et description de chaque algorithme dans le menu
+ALGORITHM_DESCRIPTIONS = {
+    "BFS": ("BFS (Breadth-First Search)",
+            ["• Nombre de poussées minimal", "• Explore poussée par poussée"]),
+    "DFS": ("DFS (Depth-First Search)",
+            ["• Profondeur croissante, peu de mémoire", "• Abandonne après 5 s sans solution"]),
+    "A*": ("A* (recherche informée)",
+           ["• Guidé par les distances aux objectifs", "• Passe en IDA* si la mémoire manque"]),
+    "BIDIR": ("Bidirectionnel",
+              ["• Pousse depuis le départ, tire depuis la fin", "• Les deux recherches se rejoignent"]),
+    "ANYTIME": ("Anytime (A* pondéré)",
+                ["• Première solution tout de suite", "• Puis des solutions de plus en plus courtes"]),
+}
 
 
 
@@ -68,45 +95,7 @@ selected_algorithm = "BFS"  # NOUVEAU - par défaut BFS
 
 
 
-# Niveaux progressifs
-levels = [
-    # Niveau 1 - Très facile
-    [
-        "########",
-        "#      #",
-        "# $  . #",
-        "#   P  #",
-        "#      #",
-        "########",
-    ],
-    
-    # Niveau 2 - Facile
-    [
-        "##########",
-        "##      ##",
-        "## $    ##",
-        "##     P##",
-        "##      ##",
-        "####  ####",
-        "##### ####",
-        "##      ##",
-        "### .  ###",
-        "##########",
-    ],
-    
-    # Niveau 3 - Moyen
-    [
-        "############",
-        "#     #    #",
-        "# $   #  . #",
-        "## #  #  # #",
-        "#     P    #",
-        "#   $    . #",
-        "############",
-    ],
-    
 
-]
 
 current_level = 0
 
@@ -212,81 +201,60 @@ def generate_level_complete_sound():
     sound = pygame.sndarray.make_sound(sound_array)
     return sound
 
-# Générer les sons
-push_sound = generate_push_sound()
-victory_music = generate_victory_music()
-level_complete_sound = generate_level_complete_sound()
+
+
+_score_store = None
+
+
+def get_score_store():
+    """Base des scores, ouverte au premier besoin"""
+    global _score_store
+    if _score_store is None:
+        _score_store = ScoreStore(SCORES_DB, LEGACY_FILE, len(levels))
+    return _score_store
 
 
 def save_score(name, level_reached, completed_all=False):
     """Sauvegarde le score du joueur"""
-    global selected_algorithm  # AJOUTER cette ligne
-    
-    score_data = {
-        'name': name,
-        'level_reached': level_reached,
-        'completed_all': completed_all,
-        'algorithm': selected_algorithm,  # NOUVEAU
-        'date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    }
-    
-    # Lire les scores existants
-    scores = load_scores()
-    scores.append(score_data)
-    
-    # Sauvegarder dans le fichier
     try:
-        with open(SCORES_FILE, 'w', encoding='utf-8') as f:
-            for score in scores:
-                status = "VICTOIRE TOTALE" if score.get('completed_all', False) else f"NIVEAU {score.get('level_reached', 1)}"
-                algo = score.get('algorithm', 'BFS')  # Par défaut BFS pour les anciens scores
-                f.write(f"{score['name']} - {status} - {algo} - {score['date']}\n")
+        get_score_store().add(name, level_reached, completed_all, selected_algorithm)
         print(f"Score sauvegardé pour {name}")
     except Exception as e:
         print(f"Erreur lors de la sauvegarde: {e}")
 
-def load_scores():
-    """Charge les scores depuis le fichier"""
-    scores = []
-    if os.path.exists(SCORES_FILE):
-        try:
-            with open(SCORES_FILE, 'r', encoding='utf-8') as f:
-                for line in f:
-                    if ' - ' in line:
-                        parts = line.strip().split(' - ')
-                        if len(parts) >= 3:
-                            name = parts[0]
-                            status = parts[1]
-                            date = parts[2]
-                            
-                            completed_all = "VICTOIRE TOTALE" in status
-                            if completed_all:
-                                level_reached = len(levels)
-                            else:
-                                try:
-                                    level_reached = int(status.split()[1])
-                                except:
-                                    level_reached = 1
-                            
-                            scores.append({
-                                'name': name,
-                                'level_reached': level_reached,
-                                'completed_all': completed_all,
-                                'date': date
-                            })
-        except Exception as e:
-            print(f"Erreur lors du chargement: {e}")
-    return scores
+
+# Polices et textes déjà rendus : les recréer à chaque image coûte cher
+_fonts = {}
+_texts = {}
+
+def get_font(size):
+    """Police par défaut de la taille demandée, créée une seule fois"""
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.Font(None, size)
+    return font
+
+def render_text(text, size, color):
+    """Surface d'un texte, rendue une seule fois pour un même texte"""
+    key = (text, size, color)
+    surface = _texts.get(key)
+    if surface is None:
+        if len(_texts) >= 512:
+            _texts.clear()
+        surface = _texts[key] = get_font(size).render(text, True, color)
+    return surface
+
+def blit_centered(text, size, color, y):
+    """Affiche un texte centré horizontalement à la hauteur y"""
+    surface = render_text(text, size, color)
+    screen.blit(surface, surface.get_rect(center=(WINDOW_WIDTH // 2, y)))
 
 def draw_name_input():
     """Dessine l'écran de saisie du nom"""
     screen.fill(DARK_GRAY)
     
     # Titre
-    title_font = pygame.font.Font(None, 48)
-    title_text = title_font.render("ENTREZ VOTRE NOM", True, WHITE)
-    title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, 200))
-    screen.blit(title_text, title_rect)
+    blit_centered("ENTREZ VOTRE NOM", 48, WHITE, 200)
     
     # Zone de saisie
     input_rect = pygame.Rect(WINDOW_WIDTH // 2 - 150, 280, 300, 50)
@@ -294,45 +262,26 @@ def draw_name_input():
     pygame.draw.rect(screen, color, input_rect, 3)
     
     # Texte saisi
-    font = pygame.font.Font(None, 36)
-    text_surface = font.render(player_name, True, WHITE)
-    screen.blit(text_surface, (input_rect.x + 10, input_rect.y + 10))
+    screen.blit(render_text(player_name, 36, WHITE), (input_rect.x + 10, input_rect.y + 10))
     
     # Instructions
-    instr_font = pygame.font.Font(None, 24)
-    instr_text = instr_font.render("Appuyez sur ENTRÉE pour commencer", True, GRAY)
-    instr_rect = instr_text.get_rect(center=(WINDOW_WIDTH // 2, 380))
-    screen.blit(instr_text, instr_rect)
+    blit_centered("Appuyez sur ENTRÉE pour commencer", 24, GRAY, 380)
 
 def draw_game_over():
     """Dessine l'écran de game over"""
     screen.fill(DARK_GRAY)
     
     # Titre
-    title_font = pygame.font.Font(None, 48)
-    title_text = title_font.render("PARTIE TERMINÉE", True, RED)
-    title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, 150))
-    screen.blit(title_text, title_rect)
-    
-    # Score atteint
-    score_font = pygame.font.Font(None, 32)
-    score_text = score_font.render(f"Niveau atteint: {current_level + 1}/{len(levels)}", True, WHITE)
-    score_rect = score_text.get_rect(center=(WINDOW_WIDTH // 2, 220))
-    screen.blit(score_text, score_rect)
-    
-    # Nom du joueur
-    name_text = score_font.render(f"Joueur: {player_name}", True, GOLD)
-    name_rect = name_text.get_rect(center=(WINDOW_WIDTH // 2, 260))
-    screen.blit(name_text, name_rect)
+    blit_centered("PARTIE TERMINÉE", 48, RED, 150)
+    
+    # Score atteint et nom du joueur
+    blit_centered(f"Niveau atteint: {current_level + 1}/{len(levels)}", 32, WHITE, 220)
+    blit_centered(f"Joueur: {player_name}", 32, GOLD, 260)
     
     # Message sauvegarde
-    save_font = pygame.font.Font(None, 24)
-    save_text = save_font.render("Score sauvegardé!", True, GREEN)
-    save_rect = save_text.get_rect(center=(WINDOW_WIDTH // 2, 300))
-    screen.blit(save_text, save_rect)
+    blit_centered("Score sauvegardé!", 24, GREEN, 300)
     
     # Bouton retour menu
-    restart_button = Button(WINDOW_WIDTH // 2 - 100, 350, 200, 50, "NOUVELLE PARTIE", GREEN, WHITE, 28)
     restart_button.draw(screen)
 
 
@@ -342,12 +291,17 @@ class Button:
         self.text = text
         self.color = color
         self.text_color = text_color
-        self.font = pygame.font.Font(None, font_size)
+        self.text_surface = render_text(text, font_size, text_color)
         self.hover_color = (min(255, color[0] + 30), min(255, color[1] + 30), min(255, color[2] + 30))
         self.pressed_color = (max(0, color[0] - 30), max(0, color[1] - 30), max(0, color[2] - 30))
         self.is_pressed = False
         self.is_hovered = False
     
+    @property
+    def state(self):
+        """État visible du bouton, pour ne le redessiner que s'il change"""
+        return self.is_hovered, self.is_pressed
+    
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
             if self.rect.collidepoint(event.pos):
@@ -376,264 +330,45 @@ class Button:
         pygame.draw.rect(screen, BLACK, self.rect, 3)
         
         # Dessiner le texte centré
-        text_surface = self.font.render(self.text, True, self.text_color)
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        screen.blit(text_surface, text_rect)
-
-class Game:
-    def __init__(self):
-        self.level_data = levels[current_level]
-        self.reset()
-        self.victory_played = False
-        self.game_states = []  # Historique des états du jeu
-    
-    def load_level(self, level_index):
-        if 0 <= level_index < len(levels):
-            self.level_data = levels[level_index]
-            self.reset()
-    
-    def reset(self):
-        self.boxes = set()
-        self.goals = set()
-        self.victory_played = False
-        self.game_states = []  # Réinitialiser l'historique
-        for y, row in enumerate(self.level_data):
-            for x, cell in enumerate(row):
-                if cell == 'P':
-                    self.player = (x, y)
-                elif cell == '$':
-                    self.boxes.add((x, y))
-                elif cell == '.':
-                    self.goals.add((x, y))
-        # Sauvegarder l'état initial
-        self.save_state()
-    
-    def save_state(self):
-        """Sauvegarde l'état actuel du jeu"""
-        state = {
-            'player': self.player,
-            'boxes': self.boxes.copy()
-        }
-        self.game_states.append(state)
-    
-    def undo_move(self):
-        """In do"""
-        if len(self.game_states) > 1:  # Garder au moins l'état initial
-            self.game_states.pop()  # Supprimer l'état actuel
-            previous_state = self.game_states[-1]  # Récupérer l'état précédent
-            self.player = previous_state['player']
-            self.boxes = previous_state['boxes'].copy()
-            return True
-        return False
-    
-    def move(self, dx, dy):
-        px, py = self.player
-        nx, ny = px + dx, py + dy
-        
-        # Vérifier mur
-        if ny < 0 or ny >= len(self.level_data) or nx < 0 or nx >= len(self.level_data[ny]) or self.level_data[ny][nx] == '#':
-            return False
-        
-        box_pushed = False
-        
-        # Vérifier boîte
-        if (nx, ny) in self.boxes:
-            bx, by = nx + dx, ny + dy
-            if (by < 0 or by >= len(self.level_data) or 
-                bx < 0 or bx >= len(self.level_data[by]) or 
-                self.level_data[by][bx] == '#' or (bx, by) in self.boxes):
-                return False
-            self.boxes.remove((nx, ny))
-            self.boxes.add((bx, by))
-            box_pushed = True
-        
-        self.player = (nx, ny)
-        
-        # Sauvegarder le nouvel état après un mouvement réussi
-        self.save_state()
-        
-        # Jouer le son de poussée si une boîte a été déplacée
-        if box_pushed:
-            push_sound.play()
-        
-        return True
-    
-    def is_solved(self):
-        solved = self.boxes == self.goals
-        # Jouer la musique appropriée une seule fois
-        if solved and not self.victory_played:
-            if current_level == len(levels) - 1:  # Dernier niveau
-                victory_music.play()
-            else:
-                level_complete_sound.play()
-            self.victory_played = True
-        return solved
-    
-    def get_state(self):
-        return (self.player, tuple(sorted(self.boxes)))
-
-def bfs_solve(game):
-    start_state = game.get_state()
-    queue = deque([(start_state, [])])
-    visited = {start_state}
-    
-    while queue:
-        state, path = queue.popleft()
-        
-        # Restaurer l'état
-        game.player, boxes = state
-        game.boxes = set(boxes)
-        
-        if game.boxes == game.goals:  # Vérification directe pour éviter de jouer le son
-            return path
-        
-        # Essayer tous les mouvements
-        for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
-            old_player, old_boxes = game.player, game.boxes.copy()
-            
-            if game.move_silent(dx, dy):  # Version silencieuse pour l'IA
-                new_state = game.get_state()
-                if new_state not in visited:
-                    visited.add(new_state)
-                    queue.append((new_state, path + [(dx, dy)]))
-            
-            # Restaurer
-            game.player, game.boxes = old_player, old_boxes
-    
-    return []
-
-
-def dfs_solve(game, max_depth=30, max_states=10000):
-    """Résout le puzzle avec Depth-First Search optimisé"""
-    start_state = game.get_state()
-    visited = set()
-    states_explored = 0
-    
+        screen.blit(self.text_surface, self.text_surface.get_rect(center=self.rect.center))
 
-import time  # Ajouter cet import en haut du fichier
 
-def dfs_solve(game, max_depth=25, timeout_seconds=5):
-    """Résout le puzzle avec DFS et timeout de sécurité"""
-    start_time = time.time()
-    start_state = game.get_state()
-    visited = set()
-    states_explored = 0
-    best_solution = None
-    
-    def dfs_recursive(state, path, depth):
-        nonlocal states_explored, best_solution
-        states_explored += 1
-        
-        # Vérifier le timeout
-        if time.time() - start_time > timeout_seconds:
-            return "TIMEOUT"
-        
-        # Limite de profondeur
-        if depth > max_depth:
-            return None
-            
-        # Restaurer l'état
-        game.player, boxes = state
-        game.boxes = set(boxes)
-        
-        # Solution trouvée
-        if game.boxes == game.goals:
-            print(f"DFS: Solution trouvée en {len(path)} mouvements")
-            return path
-        
-        # Éviter les cycles
-        if state in visited:
-            return None
-        
-        visited.add(state)
-        
-        # Essayer tous les mouvements
-        for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
-            old_player, old_boxes = game.player, game.boxes.copy()
-            
-            if game.move_silent(dx, dy):
-                new_state = game.get_state()
-                if new_state not in visited:
-                    result = dfs_recursive(new_state, path + [(dx, dy)], depth + 1)
-                    if result == "TIMEOUT":
-                        return "TIMEOUT"
-                    elif result is not None:
-                        return result
-            
-            game.player, game.boxes = old_player, old_boxes
-        
-        visited.remove(state)
-        return None
-    
-    print(f"DFS: Recherche avec timeout de {timeout_seconds}s...")
-    result = dfs_recursive(start_state, [], 0)
-    
-    if result == "TIMEOUT":
-        print(f"DFS: Timeout après {timeout_seconds}s - Fallback vers BFS")
-        return bfs_solve(game)
-    elif result is None:
-        print(f"DFS: Aucune solution trouvée - Fallback vers BFS")
-        return bfs_solve(game)
-    
-    return result
-
-
-# Ajouter une version silencieuse du mouvement pour l'IA
-def move_silent(self, dx, dy):
-    px, py = self.player
-    nx, ny = px + dx, py + dy
-    
-    if (ny < 0 or ny >= len(self.level_data) or 
-        nx < 0 or nx >= len(self.level_data[ny]) or 
-        self.level_data[ny][nx] == '#'):
-        return False
+class SoundGame(Game):
+    """Partie avec les sons de l'interface"""
     
-    if (nx, ny) in self.boxes:
-        bx, by = nx + dx, ny + dy
-        if (by < 0 or by >= len(self.level_data) or 
-            bx < 0 or bx >= len(self.level_data[by]) or 
-            self.level_data[by][bx] == '#' or (bx, by) in self.boxes):
-            return False
-        self.boxes.remove((nx, ny))
-        self.boxes.add((bx, by))
+    def on_push(self):
+        push_sound.play()
     
-    self.player = (nx, ny)
-    return True
+    def on_solved(self):
+        if self.level_index == len(self.levels) - 1:  # Dernier niveau
+            victory_music.play()
+        else:
+            level_complete_sound.play()
 
-# Ajouter la méthode silencieuse à la classe
-Game.move_silent = move_silent
+def get_tile_size():
+    """Taille d'une case : SIZE, réduite si le niveau ne tient pas dans la fenêtre"""
+    columns = max(len(row) for row in game.level_data)
+    rows = len(game.level_data)
+    return max(4, min(SIZE, WINDOW_WIDTH // columns, (WINDOW_HEIGHT - 160) // rows))
 
 def get_level_offset():
     """Calcule l'offset pour centrer le niveau"""
-    level_width = len(game.level_data[0]) * SIZE
-    level_height = len(game.level_data) * SIZE
+    size = get_tile_size()
+    level_width = max(len(row) for row in game.level_data) * size
+    level_height = len(game.level_data) * size
     offset_x = (WINDOW_WIDTH - level_width) // 2
     offset_y = (WINDOW_HEIGHT - level_height - 80) // 2  # -80 pour laisser place aux boutons
     return offset_x, offset_y
 
 def draw_menu():
     screen.fill(DARK_GRAY)
-
-    # Bouton d'entrée , entrée le nom du joueur
-    enter_button = Button(WINDOW_WIDTH // 2 - 100, 320, 200, 60, "COMMENCER", GREEN, WHITE, 36)
-    
-    # Titre SOKOBAN
-    title_font = pygame.font.Font(None, 72)
-    title_text = title_font.render("SOKOBAN", True, WHITE)
-    title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, 150))
-    screen.blit(title_text, title_rect)
     
-    # Sous-titre
-    subtitle_font = pygame.font.Font(None, 24)
-    subtitle_text = subtitle_font.render("Résolution automatique par BFS", True, GRAY)
-    subtitle_rect = subtitle_text.get_rect(center=(WINDOW_WIDTH // 2, 200))
-    screen.blit(subtitle_text, subtitle_rect)
+    # Titre SOKOBAN et sous-titre
+    blit_centered("SOKOBAN", 72, WHITE, 150)
+    blit_centered("Résolution automatique par BFS", 24, GRAY, 200)
     
     # Afficher le niveau actuel
-    level_font = pygame.font.Font(None, 36)
-    level_text = level_font.render(f"Niveau {current_level + 1}/{len(levels)}", True, GOLD)
-    level_rect = level_text.get_rect(center=(WINDOW_WIDTH // 2, 250))
-    screen.blit(level_text, level_rect)
+    blit_centered(f"Niveau {current_level + 1}/{len(levels)}", 36, GOLD, 250)
     
     # Dessiner le bouton d'entrée
     enter_button.draw(screen)
@@ -649,24 +384,14 @@ def draw_level_complete():
         title_text = "NIVEAU TERMINÉ!"
         subtitle_text = f"Niveau {current_level + 1} complété!"
     
-    title_font = pygame.font.Font(None, 48)
-    title_surface = title_font.render(title_text, True, GOLD)
-    title_rect = title_surface.get_rect(center=(WINDOW_WIDTH // 2, 200))
-    screen.blit(title_surface, title_rect)
-    
-    subtitle_font = pygame.font.Font(None, 32)
-    subtitle_surface = subtitle_font.render(subtitle_text, True, WHITE)
-    subtitle_rect = subtitle_surface.get_rect(center=(WINDOW_WIDTH // 2, 250))
-    screen.blit(subtitle_surface, subtitle_rect)
+    blit_centered(title_text, 48, GOLD, 200)
+    blit_centered(subtitle_text, 32, WHITE, 250)
     
     # Dessiner les boutons selon le niveau actuel
     if current_level < len(levels) - 1:  # Pas le dernier niveau
         next_level_button.draw(screen)
-        # Repositionner le bouton menu
-        menu_button_pos = Button(WINDOW_WIDTH // 2 - 80, 390, 160, 40, "MENU PRINCIPAL", RED, WHITE, 24)
-        menu_button_pos.draw(screen)
+        menu_button.draw(screen)
     else:  # Dernier niveau - seulement le bouton menu centré
-        menu_button_centered = Button(WINDOW_WIDTH // 2 - 80, 320, 160, 40, "MENU PRINCIPAL", RED, WHITE, 24)
         menu_button_centered.draw(screen)
 
 
@@ -676,53 +401,26 @@ def draw_algorithm_choice():
     screen.fill(DARK_GRAY)
     
     # Titre
-    title_font = pygame.font.Font(None, 48)
-    title_text = title_font.render("CHOISIR L'ALGORITHME", True, WHITE)
-    title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, 150))
-    screen.blit(title_text, title_rect)
-    
-    # Description des algorithmes
-    desc_font = pygame.font.Font(None, 24)
-    
-    # BFS
-    bfs_color = GOLD if selected_algorithm == "BFS" else WHITE
-    bfs_text = desc_font.render("BFS (Breadth-First Search)", True, bfs_color)
-    bfs_rect = bfs_text.get_rect(center=(WINDOW_WIDTH // 2, 220))
-    screen.blit(bfs_text, bfs_rect)
-    
-    bfs_desc = desc_font.render("• Solution optimale garantie", True, GRAY)
-    bfs_desc_rect = bfs_desc.get_rect(center=(WINDOW_WIDTH // 2, 245))
-    screen.blit(bfs_desc, bfs_desc_rect)
-    
-    bfs_desc2 = desc_font.render("• Explore niveau par niveau", True, GRAY)
-    bfs_desc2_rect = bfs_desc2.get_rect(center=(WINDOW_WIDTH // 2, 265))
-    screen.blit(bfs_desc2, bfs_desc2_rect)
-    
-    # DFS
-    dfs_color = GOLD if selected_algorithm == "DFS" else WHITE
-    dfs_text = desc_font.render("DFS (Depth-First Search)", True, dfs_color)
-    dfs_rect = dfs_text.get_rect(center=(WINDOW_WIDTH // 2, 320))
-    screen.blit(dfs_text, dfs_rect)
-    
-    dfs_desc = desc_font.render("• Plus rapide à trouver une solution", True, GRAY)
-    dfs_desc_rect = dfs_desc.get_rect(center=(WINDOW_WIDTH // 2, 345))
-    screen.blit(dfs_desc, dfs_desc_rect)
-    
-    dfs_desc2 = desc_font.render("• Solution pas forcément optimale", True, GRAY)
-    dfs_desc2_rect = dfs_desc2.get_rect(center=(WINDOW_WIDTH // 2, 365))
-    screen.blit(dfs_desc2, dfs_desc2_rect)
+    blit_centered("CHOISIR L'ALGORITHME", 48, WHITE, 150)
+    
+    # Description des algorithmes, espacées selon leur nombre
+    spacing = min(90, 270 // len(ALGORITHMS))
+    # Descriptions plus petites quand il y a beaucoup d'algorithmes
+    line_size, line_offset, line_step = (20, 20, 15) if spacing < 60 else (24, 22, 18)
+    
+    for i, name in enumerate(ALGORITHMS):
+        title, lines = ALGORITHM_DESCRIPTIONS[name]
+        y = 200 + spacing * i
+        blit_centered(title, 24, GOLD if selected_algorithm == name else WHITE, y)
+        for j, line in enumerate(lines):
+            blit_centered(line, line_size, GRAY, y + line_offset + line_step * j)
     
     # Instructions
-    instr_font = pygame.font.Font(None, 28)
-    instr_text = instr_font.render("↑↓ pour changer, ENTRÉE pour confirmer", True, WHITE)
-    instr_rect = instr_text.get_rect(center=(WINDOW_WIDTH // 2, 450))
-    screen.blit(instr_text, instr_rect)
+    blit_centered("↑↓ pour changer, ENTRÉE pour confirmer", 28, WHITE, 480)
     
     # Indicateur de sélection
-    if selected_algorithm == "BFS":
-        pygame.draw.rect(screen, GOLD, (WINDOW_WIDTH // 2 - 200, 210, 400, 70), 3)
-    else:
-        pygame.draw.rect(screen, GOLD, (WINDOW_WIDTH // 2 - 200, 310, 400, 70), 3)
+    selection_y = 190 + spacing * ALGORITHMS.index(selected_algorithm)
+    pygame.draw.rect(screen, GOLD, (WINDOW_WIDTH // 2 - 200, selection_y, 400, min(70, spacing - 2)), 3)
 
 
 
@@ -737,213 +435,459 @@ def draw_algorithm_choice():
 
 
 
-def draw_game():
-    screen.fill((50, 50, 50))
-    
+# Bandeaux de texte de l'écran de jeu (en haut, et statistiques en bas)
+HUD_RECTS = [pygame.Rect(0, 0, WINDOW_WIDTH, 80), pygame.Rect(0, 474, WINDOW_WIDTH, 40)]
+
+# Fond du niveau courant et contenu de la dernière image affichée
+background_cache = {}
+last_frame = {}
+
+def get_background():
+    """Fond du niveau courant (murs et objectifs), dessiné une fois par niveau"""
+    size = get_tile_size()
+    key = (tuple(game.level_data), size)
+    if background_cache.get('key') != key:
+        offset_x, offset_y = get_level_offset()
+        surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+        surface.fill((50, 50, 50))
+        for y, row in enumerate(game.level_data):
+            for x, cell in enumerate(row):
+                if cell == '#':
+                    pygame.draw.rect(surface, (100, 100, 100),
+                                     (x * size + offset_x, y * size + offset_y, size, size))
+        for x, y in game.goals:
+            pygame.draw.circle(surface, (0, 255, 0),
+                               (x * size + size // 2 + offset_x, y * size + size // 2 + offset_y),
+                               size // 4)
+        background_cache['key'] = key
+        background_cache['surface'] = surface
+    return background_cache['surface']
+
+def tile_rect(cell):
+    """Rectangle de l'écran occupé par une case du niveau"""
+    size = get_tile_size()
     offset_x, offset_y = get_level_offset()
+    return pygame.Rect(cell[0] * size + offset_x, cell[1] * size + offset_y, size, size)
 
-    # Afficher informations en haut
-    info_font = pygame.font.Font(None, 24)
-    level_text = info_font.render(f"Niveau {current_level + 1}/{len(levels)}", True, WHITE)
-    screen.blit(level_text, (10, 10))
-
-    # NOUVEAU - Afficher l'algorithme utilisé
-    algo_text = info_font.render(f"Algorithme: {selected_algorithm}", True, GOLD)
-    screen.blit(algo_text, (200, 10))
-    
-    # Dessiner niveau
-    for y, row in enumerate(game.level_data):
-        for x, cell in enumerate(row):
-            rect = pygame.Rect(x * SIZE + offset_x, y * SIZE + offset_y, SIZE, SIZE)
-            if cell == '#':
-                pygame.draw.rect(screen, (100, 100, 100), rect)
-    
-    # Dessiner objectifs
-    for x, y in game.goals:
-        pygame.draw.circle(screen, (0, 255, 0), 
-                         (x * SIZE + SIZE//2 + offset_x, y * SIZE + SIZE//2 + offset_y), SIZE//4)
-    
-    # Dessiner boîtes
-    for x, y in game.boxes:
-        color = (255, 255, 0) if (x, y) in game.goals else (139, 69, 19)
-        pygame.draw.rect(screen, color, 
-                        (x * SIZE + 5 + offset_x, y * SIZE + 5 + offset_y, SIZE - 10, SIZE - 10))
-    
-    # Dessiner joueur
-    px, py = game.player
-    pygame.draw.circle(screen, (255, 0, 0), 
-                      (px * SIZE + SIZE//2 + offset_x, py * SIZE + SIZE//2 + offset_y), SIZE//3)
-    
-    # Afficher informations en haut
-    info_font = pygame.font.Font(None, 24)
-    level_text = info_font.render(f"Niveau {current_level + 1}/{len(levels)}", True, WHITE)
-    screen.blit(level_text, (10, 10))
-    
-    if move_index < len(solution):
-        progress_text = info_font.render(f"ESPACE: {move_index}/{len(solution)}", True, WHITE)
-        screen.blit(progress_text, (10, 35))
+def draw_piece(cell):
+    """Dessine la caisse ou le joueur présent sur une case"""
+    size = get_tile_size()
+    inset = size // 8
+    offset_x, offset_y = get_level_offset()
+    x, y = cell[0] * size + offset_x, cell[1] * size + offset_y
+    if cell in game.boxes:
+        color = (255, 255, 0) if cell in game.goals else (139, 69, 19)
+        pygame.draw.rect(screen, color, (x + inset, y + inset, size - 2 * inset, size - 2 * inset))
+    if cell == game.player:
+        pygame.draw.circle(screen, (255, 0, 0), (x + size // 2, y + size // 2), size // 3)
+
+def hud_lines():
+    """Textes des bandeaux : (texte, couleur, position, taille de police)"""
+    lines = [
+        (f"Niveau {current_level + 1}/{len(levels)}", WHITE, (10, 10), 24),
+        (f"Algorithme: {selected_algorithm}", GOLD, (200, 10), 24),
+    ]
+    if detour:
+        lines.append((f"Hors de la solution ({detour}) - ESPACE: suivre les indices",
+                      WHITE, (10, 35), 24))
+    elif solver_job is not None and solution:
+        # Solveur anytime : la solution se joue pendant qu'il l'améliore
+        lines.append((f"ESPACE: {move_index}/{len(solution)} - amélioration... "
+                      f"{solver_job.elapsed:.1f}s", GOLD, (10, 35), 24))
+    elif solver_job is not None:
+        lines.append((f"Recherche... {solver_job.nodes} nœuds - {solver_job.elapsed:.1f}s",
+                      GOLD, (10, 35), 24))
+    elif move_index < len(solution):
+        lines.append((f"ESPACE: {move_index}/{len(solution)}", WHITE, (10, 35), 24))
+    elif better_solution:
+        lines.append(("Solution plus courte trouvée! R pour la jouer", GOLD, (10, 35), 24))
     else:
-        complete_text = info_font.render("Solution terminée! R pour recommencer", True, WHITE)
-        screen.blit(complete_text, (10, 35))
-    
-    # Afficher les contrôles
-    controls_text = info_font.render("BACKSPACE: Annuler mouvement", True, WHITE)
-    screen.blit(controls_text, (10, 60))
-    
-    # Dessiner les boutons
-    exit_button.draw(screen)
-    undo_button.draw(screen)
-
-# Créer les boutons
-enter_button = Button(WINDOW_WIDTH // 2 - 100, 320, 200, 60, "ENTRER", GREEN, WHITE, 36)
-exit_button = Button(WINDOW_WIDTH // 2 - 130, 520, 120, 40, "MENU", RED, WHITE, 24)
-undo_button = Button(WINDOW_WIDTH // 2 + 10, 520, 120, 40, "ANNULER", ORANGE, WHITE, 24)
-next_level_button = Button(WINDOW_WIDTH // 2 - 120, 320, 240, 50, "NIVEAU SUIVANT", BLUE, WHITE, 28)
-menu_button = Button(WINDOW_WIDTH // 2 - 80, 390, 160, 40, "MENU PRINCIPAL", RED, WHITE, 24)
-
-# Initialiser le jeu
-game = Game()
-solution = []
-move_index = 0
-clock = pygame.time.Clock()
-
-print("Bienvenue dans Sokoban!")
-print(f"3 niveaux disponibles - Niveau actuel: {current_level + 1}")
-print("Cliquez sur ENTRER pour commencer")
-
-while True:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            exit()
-        
-        if game_state == MENU:
-            if enter_button.handle_event(event):
-                game_state = ALGORITHM_CHOICE  # MODIFIÉ - aller au choix d'algorithme
-        
-        elif game_state == ALGORITHM_CHOICE:  # NOUVEAU
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP or event.key == pygame.K_DOWN:
-                    selected_algorithm = "DFS" if selected_algorithm == "BFS" else "BFS"
-                elif event.key == pygame.K_RETURN:
-                    game_state = NAME_INPUT
-                    input_active = True
-                elif event.key == pygame.K_ESCAPE:
-                    game_state = MENU
-        
-        elif game_state == NAME_INPUT:
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN and player_name.strip():
-                    game_state = PLAYING
-                    game.load_level(current_level)
-                    
-                    # MODIFIÉ - Choisir l'algorithme selon la sélection
-                    print(f"Résolution du niveau {current_level + 1} avec {selected_algorithm}...")
-                    if selected_algorithm == "BFS":
-                        solution = bfs_solve(game)
-                    else:  # DFS
-                        solution = dfs_solve(game)
-                    
-                    game.reset()
-                    move_index = 0
-                    if solution:
-                        print(f"Solution trouvée en {len(solution)} mouvements avec {selected_algorithm}!")
-                    else:
-                        print(f"Aucune solution trouvée avec {selected_algorithm} (limite de profondeur atteinte)")
-                    print(f"Joueur: {player_name}")
-                elif event.key == pygame.K_BACKSPACE:
-                    player_name = player_name[:-1]
-                elif event.key == pygame.K_ESCAPE:
-                    game_state = ALGORITHM_CHOICE  # MODIFIÉ - retour au choix d'algorithme
-                    player_name = ""
-                    input_active = False
-                else:
-                    if len(player_name) < 20 and event.unicode.isprintable():
-                        player_name += event.unicode
-        
-        elif game_state == PLAYING:
-            if exit_button.handle_event(event):
-                save_score(player_name, current_level + 1, False)
-                game_state = GAME_OVER
-            
-            if undo_button.handle_event(event):
-                if game.undo_move():
-                    if move_index > 0:
-                        move_index -= 1
-                    print("Annulation")
-            
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE and move_index < len(solution):
-                    dx, dy = solution[move_index]
-                    game.move(dx, dy)
-                    move_index += 1
-                    
-                    if game.is_solved():
-                        game_state = LEVEL_COMPLETE
-                        
-                elif event.key == pygame.K_r:
-                    game.reset()
-                    move_index = 0
-                elif event.key == pygame.K_BACKSPACE:
-                    if game.undo_move():
-                        if move_index > 0:
-                            move_index -= 1
-                        print("Annulation")
-                elif event.key == pygame.K_ESCAPE:
-                    save_score(player_name, current_level + 1, False)
-                    game_state = GAME_OVER
-        
-        elif game_state == LEVEL_COMPLETE:
-            if current_level < len(levels) - 1:
-                if next_level_button.handle_event(event):
-                    current_level += 1
-                    print(f"Passage au niveau {current_level + 1}")
-                    game_state = PLAYING
-                    game.load_level(current_level)
-                    
-                    # MODIFIÉ - Utiliser l'algorithme sélectionné
-                    if selected_algorithm == "BFS":
-                        solution = bfs_solve(game)
-                    else:
-                        solution = dfs_solve(game)
-                    
-                    game.reset()
-                    move_index = 0
-                    print(f"Solution trouvée en {len(solution)} mouvements avec {selected_algorithm}!")
-                
-                menu_click_area = pygame.Rect(WINDOW_WIDTH // 2 - 80, 390, 160, 40)
-                if event.type == pygame.MOUSEBUTTONDOWN and menu_click_area.collidepoint(event.pos):
-                    save_score(player_name, current_level + 1, False)
-                    game_state = GAME_OVER
-            else:
-                save_score(player_name, len(levels), True)
-                menu_click_area = pygame.Rect(WINDOW_WIDTH // 2 - 80, 320, 160, 40)
-                if event.type == pygame.MOUSEBUTTONDOWN and menu_click_area.collidepoint(event.pos):
-                    game_state = GAME_OVER
-        
-        elif game_state == GAME_OVER:
-            restart_click_area = pygame.Rect(WINDOW_WIDTH // 2 - 100, 350, 200, 50)
-            if event.type == pygame.MOUSEBUTTONDOWN and restart_click_area.collidepoint(event.pos):
-                current_level = 0
-                player_name = ""
-                selected_algorithm = "BFS"  # NOUVEAU - réinitialiser
-                game_state = MENU
-                move_index = 0
-                solution = []
-    
-    # Dessiner selon l'état du jeu
+        lines.append(("Solution terminée! R pour recommencer", WHITE, (10, 35), 24))
+    if hint_wanted:
+        lines.append(("Indice: recherche...", GOLD, (10, 60), 24))
+    elif hint is not None and hint[0] == game.get_state():
+        lines.append((f"Indice: {HINT_TEXTS.get(hint[1], 'aucune solution')}", GOLD, (10, 60), 24))
+    else:
+        lines.append(("Flèches: Jouer - BACKSPACE: Annuler - Y: Refaire - H: Indice",
+                      WHITE, (10, 60), 20))
+    
+    # Pendant la recherche, seulement les compteurs (le solveur modifie les phases)
+    stats = solver_job.stats.counters() if solver_job is not None else search_stats
+    if stats:
+        lines.extend(search_stats_lines(stats))
+    return tuple(lines)
+
+def search_stats_lines(stats):
+    """Lignes des statistiques d'une recherche, au-dessus des boutons"""
+    return [
+        (f"Développés {stats.get('expanded', stats.get('nodes', 0))} - "
+         f"générés {stats.get('generated', 0)} - doublons {stats.get('duplicates', 0)} - "
+         f"élagués {stats.get('pruned', 0)}", GRAY, (10, 478), 20),
+        (f"Frontière max {stats.get('peak_frontier', 0)} - profondeur {stats.get('depth', 0)} - "
+         f"{stats.get('bytes_per_state', 0)} o/état", GRAY, (10, 496), 20),
+    ]
+
+def draw_hud(lines, background):
+    """Redessine les bandeaux de texte et les pièces qu'ils recouvrent"""
+    for rect in HUD_RECTS:
+        screen.blit(background, rect, rect)
+    for cell in game.boxes | {game.player}:
+        if tile_rect(cell).collidelist(HUD_RECTS) != -1:
+            draw_piece(cell)
+    for text, color, position, size in lines:
+        screen.blit(render_text(text, size, color), position)
+
+def draw_game():
+    """Dessine la partie ; renvoie les rectangles de l'écran modifiés
+
+    Le fond (murs, objectifs) est rendu une fois par niveau. D'une image
+    à l'autre, on ne redessine que les cases dont le contenu a changé,
+    les bandeaux dont le texte a changé et les boutons survolés.
+    """
+    background = get_background()
+    pieces = (game.player, frozenset(game.boxes))
+    hud = hud_lines()
+    buttons = (exit_button.state, undo_button.state)
+    
+    if last_frame.get('screen') != background_cache['key']:
+        # Nouvel écran ou nouveau niveau : tout redessiner
+        screen.blit(background, (0, 0))
+        for cell in pieces[1] | {game.player}:
+            draw_piece(cell)
+        draw_hud(hud, background)
+        exit_button.draw(screen)
+        undo_button.draw(screen)
+        rects = [screen.get_rect()]
+    else:
+        rects = []
+        old_player, old_boxes = last_frame['pieces']
+        if last_frame['pieces'] != pieces:
+            for cell in (old_boxes ^ pieces[1]) | {old_player, game.player}:
+                rect = tile_rect(cell)
+                screen.blit(background, rect, rect)
+                draw_piece(cell)
+                rects.append(rect)
+        if last_frame['hud'] != hud or any(rect.collidelist(HUD_RECTS) != -1 for rect in rects):
+            draw_hud(hud, background)
+            rects.extend(HUD_RECTS)
+        if last_frame['buttons'] != buttons:
+            exit_button.draw(screen)
+            undo_button.draw(screen)
+            rects.extend([exit_button.rect, undo_button.rect])
+    
+    last_frame.clear()
+    last_frame.update(screen=background_cache['key'], pieces=pieces, hud=hud, buttons=buttons)
+    return rects
+
+def draw_screen():
+    """Dessine l'écran courant ; renvoie les rectangles de l'écran modifiés
+
+    Les écrans de menu ne sont redessinés que si leur contenu a changé.
+    """
+    if game_state == PLAYING:
+        return draw_game()
+    
+    key = (game_state, selected_algorithm, player_name, input_active, current_level,
+           tuple(button.state for button in buttons))
+    if last_frame.get('screen') == key:
+        return []
     if game_state == MENU:
         draw_menu()
-    elif game_state == ALGORITHM_CHOICE:  # NOUVEAU
+    elif game_state == ALGORITHM_CHOICE:
         draw_algorithm_choice()
     elif game_state == NAME_INPUT:
         draw_name_input()
-    elif game_state == PLAYING:
-        draw_game()
     elif game_state == LEVEL_COMPLETE:
         draw_level_complete()
     elif game_state == GAME_OVER:
         draw_game_over()
-    
-    pygame.display.flip()
-    clock.tick(60)
\ No newline at end of file
+    last_frame.clear()
+    last_frame['screen'] = key
+    return [screen.get_rect()]
+
+def start_solver():
+    """Lance la résolution du niveau courant, sauf si elle est en cache
+
+    Renvoie (solution, job, stats) : la solution du cache, None et les
+    statistiques enregistrées avec elle, ou une liste vide, la résolution
+    lancée en arrière-plan et None.
+    """
+    cached = solution_cache.get(game.level_data, selected_algorithm)
+    if cached is not None:
+        print(f"Solution en cache pour le niveau {current_level + 1} avec {selected_algorithm}: "
+              f"{len(cached)} mouvements")
+        learn_solution(cached)
+        return cached, None, solution_cache.stats(game.level_data, selected_algorithm)
+    print(f"Résolution du niveau {current_level + 1} avec {selected_algorithm}...")
+    return [], SolverJob(SOLVERS[selected_algorithm], game), None
+
+def cancel_solver():
+    """Annule la résolution en cours, s'il y en a une"""
+    if solver_job is not None and not solver_job.done:
+        solver_job.cancel()
+        print("Résolution annulée")
+    return None
+
+def learn_solution(moves):
+    """Ajoute une solution du niveau courant à la table des indices"""
+    board = Board.for_level(game.level_data)
+    HintEngine.for_level(game.level_data).learn(board.player, board.boxes, moves)
+
+def track_move(move):
+    """Nouvelles valeurs de (move_index, detour) après un déplacement joué
+    au clavier : on reste sur la solution s'il en est le mouvement suivant"""
+    if not detour and move_index < len(solution) and solution[move_index] == move:
+        return move_index + 1, 0
+    return move_index, detour + 1
+
+if __name__ == "__main__":
+    # Initialiser pygame, la fenêtre et les sons
+    pygame.init()
+    pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption("Sokoban BFS")
+
+    # Générer les sons
+    push_sound = generate_push_sound()
+    victory_music = generate_victory_music()
+    level_complete_sound = generate_level_complete_sound()
+
+    # Recueil de niveaux passé en argument : python Programme.py recueil.xsb
+    if len(sys.argv) > 1:
+        levels = LevelCollection(sys.argv[1])
+
+    # Créer les boutons, une seule fois
+    enter_button = Button(WINDOW_WIDTH // 2 - 100, 320, 200, 60, "COMMENCER", GREEN, WHITE, 36)
+    exit_button = Button(WINDOW_WIDTH // 2 - 130, 520, 120, 40, "MENU", RED, WHITE, 24)
+    undo_button = Button(WINDOW_WIDTH // 2 + 10, 520, 120, 40, "ANNULER", ORANGE, WHITE, 24)
+    next_level_button = Button(WINDOW_WIDTH // 2 - 120, 320, 240, 50, "NIVEAU SUIVANT", BLUE, WHITE, 28)
+    menu_button = Button(WINDOW_WIDTH // 2 - 80, 390, 160, 40, "MENU PRINCIPAL", RED, WHITE, 24)
+    menu_button_centered = Button(WINDOW_WIDTH // 2 - 80, 320, 160, 40, "MENU PRINCIPAL", RED, WHITE, 24)
+    restart_button = Button(WINDOW_WIDTH // 2 - 100, 350, 200, 50, "NOUVELLE PARTIE", GREEN, WHITE, 28)
+    buttons = [enter_button, exit_button, undo_button, next_level_button, menu_button,
+               menu_button_centered, restart_button]
+
+    # Initialiser le jeu
+    game = SoundGame(levels, current_level)
+    solution = []
+    better_solution = None  # Solution plus courte arrivée pendant la lecture
+    move_index = 0
+    detour = 0  # Mouvements joués au clavier hors de la solution
+    hint = None  # Dernier indice : (position, déplacement ou None)
+    hint_wanted = False  # Indice demandé, recherche en cours
+    solver_job = None  # Résolution en cours
+    search_stats = None  # Statistiques de la dernière recherche (dict)
+    solution_cache = SolutionCache()
+    score_saved = False  # Score de la victoire totale déjà enregistré
+    clock = pygame.time.Clock()
+
+    print("Bienvenue dans Sokoban!")
+    print(f"{len(levels)} niveaux disponibles - Niveau actuel: {current_level + 1}")
+    print("Cliquez sur ENTRER pour commencer")
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                cancel_solver()
+                pygame.quit()
+                exit()
+            if event.type == pygame.VIDEOEXPOSE:
+                last_frame.clear()  # Fenêtre à redessiner entièrement
+
+            if game_state == MENU:
+                if enter_button.handle_event(event):
+                    game_state = ALGORITHM_CHOICE  # MODIFIÉ - aller au choix d'algorithme
+
+            elif game_state == ALGORITHM_CHOICE:  # NOUVEAU
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_UP or event.key == pygame.K_DOWN:
+                        step = -1 if event.key == pygame.K_UP else 1
+                        index = ALGORITHMS.index(selected_algorithm)
+                        selected_algorithm = ALGORITHMS[(index + step) % len(ALGORITHMS)]
+                    elif event.key == pygame.K_RETURN:
+                        game_state = NAME_INPUT
+                        input_active = True
+                    elif event.key == pygame.K_ESCAPE:
+                        game_state = MENU
+
+            elif game_state == NAME_INPUT:
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_RETURN and player_name.strip():
+                        game_state = PLAYING
+                        game.load_level(current_level)
+
+                        # Résolution en arrière-plan avec l'algorithme sélectionné
+                        cancel_solver()
+                        solution, solver_job, search_stats = start_solver()
+                        better_solution = None
+                        move_index = detour = 0
+                        hint, hint_wanted = None, False
+                        score_saved = False
+                        print(f"Joueur: {player_name}")
+                    elif event.key == pygame.K_BACKSPACE:
+                        player_name = player_name[:-1]
+                    elif event.key == pygame.K_ESCAPE:
+                        game_state = ALGORITHM_CHOICE  # MODIFIÉ - retour au choix d'algorithme
+                        player_name = ""
+                        input_active = False
+                    else:
+                        if len(player_name) < 20 and event.unicode.isprintable():
+                            player_name += event.unicode
+
+            elif game_state == PLAYING:
+                if exit_button.handle_event(event):
+                    solver_job = cancel_solver()
+                    save_score(player_name, current_level + 1, False)
+                    game_state = GAME_OVER
+
+                if undo_button.handle_event(event):
+                    if game.undo_move():
+                        if detour:
+                            detour -= 1
+                        elif move_index > 0:
+                            move_index -= 1
+                        print("Annulation")
+
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE and detour:
+                        # Hors de la solution : on suit les indices
+                        move = HintEngine.for_level(game.level_data).hint(game.player, game.boxes)
+                        if move is False:
+                            hint_wanted = True
+                        elif move is None or move == HINT_ABANDONED:
+                            hint = (game.get_state(), move)  # Affiche pourquoi il n'y a pas d'indice
+                        elif game.move(*move):
+                            move_index, detour = track_move(move)
+                            if game.is_solved():
+                                game_state = LEVEL_COMPLETE
+                                print(f"Coups joués: {game.export_moves()}")
+
+                    elif event.key == pygame.K_SPACE and move_index < len(solution):
+                        dx, dy = solution[move_index]
+                        game.move(dx, dy)
+                        move_index += 1
+
+                        if game.is_solved():
+                            game_state = LEVEL_COMPLETE
+                            print(f"Coups joués: {game.export_moves()}")
+
+                    elif event.key in ARROW_MOVES:
+                        move = ARROW_MOVES[event.key]
+                        if game.move(*move):
+                            move_index, detour = track_move(move)
+                            if game.is_solved():
+                                game_state = LEVEL_COMPLETE
+                                print(f"Coups joués: {game.export_moves()}")
+
+                    elif event.key == pygame.K_h:
+                        hint_wanted = True
+
+                    elif event.key == pygame.K_r:
+                        game.reset()
+                        move_index = detour = 0
+                        if better_solution:
+                            solution, better_solution = better_solution, None
+                    elif event.key == pygame.K_BACKSPACE:
+                        if game.undo_move():
+                            if detour:
+                                detour -= 1
+                            elif move_index > 0:
+                                move_index -= 1
+                            print("Annulation")
+                    elif event.key == pygame.K_y:
+                        if game.redo_move():
+                            move_index, detour = track_move(DIRECTIONS[game.history[-1] >> 1])
+                            if game.is_solved():
+                                game_state = LEVEL_COMPLETE
+                                print(f"Coups joués: {game.export_moves()}")
+                    elif event.key == pygame.K_ESCAPE:
+                        solver_job = cancel_solver()
+                        save_score(player_name, current_level + 1, False)
+                        game_state = GAME_OVER
+
+            elif game_state == LEVEL_COMPLETE:
+                if current_level < len(levels) - 1:
+                    if next_level_button.handle_event(event):
+                        current_level += 1
+                        print(f"Passage au niveau {current_level + 1}")
+                        game_state = PLAYING
+                        game.load_level(current_level)
+
+                        # Résolution en arrière-plan avec l'algorithme sélectionné
+                        cancel_solver()
+                        solution, solver_job, search_stats = start_solver()
+                        better_solution = None
+                        move_index = detour = 0
+                        hint, hint_wanted = None, False
+
+                    menu_click_area = pygame.Rect(WINDOW_WIDTH // 2 - 80, 390, 160, 40)
+                    if event.type == pygame.MOUSEBUTTONDOWN and menu_click_area.collidepoint(event.pos):
+                        save_score(player_name, current_level + 1, False)
+                        game_state = GAME_OVER
+                else:
+                    # Une seule fois, et non à chaque événement
+                    if not score_saved:
+                        save_score(player_name, len(levels), True)
+                        score_saved = True
+                    menu_click_area = pygame.Rect(WINDOW_WIDTH // 2 - 80, 320, 160, 40)
+                    if event.type == pygame.MOUSEBUTTONDOWN and menu_click_area.collidepoint(event.pos):
+                        game_state = GAME_OVER
+
+            elif game_state == GAME_OVER:
+                restart_click_area = pygame.Rect(WINDOW_WIDTH // 2 - 100, 350, 200, 50)
+                if event.type == pygame.MOUSEBUTTONDOWN and restart_click_area.collidepoint(event.pos):
+                    current_level = 0
+                    player_name = ""
+                    selected_algorithm = "BFS"  # NOUVEAU - réinitialiser
+                    game_state = MENU
+                    move_index = 0
+                    solution = []
+
+        # Indice demandé : la recherche avance un peu à chaque image
+        if hint_wanted and game_state == PLAYING:
+            move = HintEngine.for_level(game.level_data).hint(game.player, game.boxes)
+            if move is not False:
+                hint, hint_wanted = (game.get_state(), move), False
+
+        # Solveur anytime : chaque solution plus courte remplace la précédente
+        # si sa lecture n'a pas commencé, sinon elle sera jouée après R
+        if solver_job is not None and solver_job.solutions:
+            moves = solver_job.result
+            if moves is not solution and moves is not better_solution:
+                print(f"Solution n°{solver_job.solutions}: {len(moves)} mouvements "
+                      f"({solver_job.elapsed:.1f}s)")
+                learn_solution(moves)
+                if move_index == 0:
+                    solution = moves
+                else:
+                    better_solution = moves
+
+        # Récupérer la solution quand la résolution en arrière-plan est finie
+        if solver_job is not None and solver_job.done:
+            # La dernière solution d'un solveur anytime peut arriver avec la fin
+            if move_index == 0:
+                solution = solver_job.result
+            elif solver_job.result is not solution:
+                better_solution = solver_job.result
+            search_stats = dict(solver_job.stats.as_dict(), nodes=solver_job.nodes,
+                                time=round(solver_job.elapsed, 3))
+            if solver_job.result:
+                learn_solution(solver_job.result)
+                print(f"Solution trouvée en {len(solver_job.result)} mouvements avec "
+                      f"{selected_algorithm} ({solver_job.nodes} nœuds, {solver_job.elapsed:.1f}s)")
+                solution_cache.put(solver_job.position.level_data, selected_algorithm,
+                                   solver_job.result, search_stats)
+            else:
+                print(f"Aucune solution trouvée avec {selected_algorithm}")
+            solver_job = None
+
+        # Le solveur ne sert qu'en jeu (un solveur anytime continuerait à
+        # chercher) : on l'arrête dès qu'on quitte la partie
+        if solver_job is not None and game_state != PLAYING:
+            solver_job = cancel_solver()
+
+        # Dessiner seulement ce qui a changé, sans dépasser FPS images par seconde
+        rects = draw_screen()
+        if rects:
+            pygame.display.update(rects)
+        clock.tick(FPS)
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""Banc d'essai des solveurs.
+
+Chaque solveur est lancé sur trois séries de niveaux :
+
+- les niveaux intégrés (niveaux.levels) ;
+- les niveaux de référence, plus difficiles (niveaux_reference.xsb) ;
+- des niveaux générés de taille croissante, toujours les mêmes d'un
+  lancement à l'autre (graine fixe).
+
+Chaque résolution tourne dans un processus neuf, pour mesurer le pic de
+mémoire (RSS) de ce seul solveur : celui du processus ou du plus gros de
+ses sous-processus (BFS-PAR), et non leur somme. Le rapport JSON donne, pour chaque
+couple (niveau, solveur) : statut, longueur de la solution, nœuds
+développés, durée, nœuds par seconde et pic de mémoire. Il peut être
+comparé à un rapport de base pour signaler les régressions.
+
+    python benchmark.py                             # tout, rapport dans benchmark.json
+    python benchmark.py --solver A* --solver BIDIR
+    python benchmark.py --save-baseline             # enregistre la base
+    python benchmark.py --baseline benchmark_base.json --tolerance 0.3
+    python benchmark.py --check                     # erreur si la base manque
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from collection_niveaux import LevelCollection
+from generateur import generate_level
+from moteur import Board
+from niveaux import levels
+from resoudre import CLI_SOLVERS, solve_one
+
+try:
+    import resource
+except ImportError:  # Windows : pas de mesure de mémoire
+    resource = None
+
+REFERENCE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "niveaux_reference.xsb")
+REPORT_FILE = "benchmark.json"
+BASELINE_FILE = "benchmark_base.json"
+
+# Niveaux générés : (largeur, hauteur, caisses, graine)
+GENERATED = [
+    (7, 7, 2, 1),
+    (8, 8, 3, 2),
+    (9, 9, 3, 3),
+    (10, 10, 4, 4),
+    (12, 10, 5, 5),
+]
+
+# En dessous de cette durée, les écarts de temps ne sont pas significatifs
+MIN_SIGNIFICANT_TIME = 0.1
+
+
+def benchmark_levels():
+    """Liste de (nom, lignes) de toutes les séries"""
+    tasks = [(f"intégré:{i + 1}", level) for i, level in enumerate(levels)]
+    reference = LevelCollection(REFERENCE_FILE)
+    for i, level in enumerate(reference):
+        tasks.append((f"référence:{i + 1}", level))
+    for width, height, box_count, seed in GENERATED:
+        tasks.append((f"généré:{width}x{height}:{box_count}",
+                      generate_level(width, height, box_count, seed)))
+    return tasks
+
+
+def run_one(name, level_data, solver_name, timeout):
+    """Résolution dans un processus neuf, avec son pic de mémoire
+
+    La base de motifs est toujours calculée, sans être lue ni enregistrée
+    dans PATTERN_DIR : la mesure ne dépend pas des lancements précédents.
+    """
+    Board.for_level(level_data).pattern_dir = None
+    result = solve_one(name, level_data, solver_name, timeout)
+    result.pop('solution')
+    result['nodes_per_second'] = round(result['nodes'] / result['time']) if result['time'] else 0
+    if resource is not None:
+        # Les processus de BFS-PAR sont terminés et attendus : comptés dans RUSAGE_CHILDREN
+        peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                   resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+        # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+        result['peak_rss_kb'] = peak // 1024 if sys.platform == 'darwin' else peak
+    return result
+
+
+def run_benchmark(solver_names, timeout):
+    """Lance chaque solveur sur chaque niveau, l'un après l'autre"""
+    results = []
+    for name, level in benchmark_levels():
+        for solver_name in solver_names:
+            # Un seul processus à la fois, pour ne pas fausser les mesures
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                try:
+                    result = pool.submit(run_one, name, level, solver_name, timeout).result()
+                except Exception as e:  # Processus tué (mémoire système...)
+                    result = {'level': name, 'solver': solver_name,
+                              'status': "erreur", 'error': str(e)}
+            print(f"{name:<22} {solver_name:<8} {result['status']:<16} "
+                  f"{result.get('length', 0):>5} coups {result.get('time', 0):>8.3f}s "
+                  f"{result.get('nodes_per_second', 0):>9} nœuds/s "
+                  f"{result.get('peak_rss_kb', 0) // 1024:>5} Mo", flush=True)
+            results.append(result)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Liste des régressions par rapport au rapport de base"""
+    previous = {(r['level'], r['solver']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        old = previous.get((result['level'], result['solver']))
+        if old is None:
+            continue
+        label = f"{result['level']} {result['solver']}"
+        if old['status'] == "résolu" and result['status'] != "résolu":
+            regressions.append(f"{label}: {result['status']} (résolu avant)")
+            continue
+        if result['status'] != "résolu":
+            continue
+        if result['length'] > old['length']:
+            regressions.append(f"{label}: solution de {result['length']} coups "
+                               f"({old['length']} avant)")
+        if (result['time'] > MIN_SIGNIFICANT_TIME
+                and result['time'] > old['time'] * (1 + tolerance)):
+            regressions.append(f"{label}: {result['time']:.3f}s ({old['time']:.3f}s avant)")
+        if result.get('peak_rss_kb', 0) > old.get('peak_rss_kb', 0) * (1 + tolerance):
+            regressions.append(f"{label}: {result['peak_rss_kb'] // 1024} Mo "
+                               f"({old['peak_rss_kb'] // 1024} Mo avant)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai des solveurs Sokoban")
+    parser.add_argument('--solver', action='append', choices=sorted(CLI_SOLVERS),
+                        help="solveur à mesurer (répétable, par défaut : tous)")
+    parser.add_argument('--timeout', type=float, default=30,
+                        help="temps maximal par résolution, en secondes")
+    parser.add_argument('--output', default=REPORT_FILE, help="rapport JSON à écrire")
+    parser.add_argument('--baseline', default=BASELINE_FILE,
+                        help="rapport de base pour la comparaison")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="enregistre ce rapport comme nouvelle base")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="écart relatif toléré sur le temps et la mémoire")
+    parser.add_argument('--check', action='store_true',
+                        help="comparaison obligatoire : erreur si la base n'existe pas")
+    args = parser.parse_args(argv)
+    if args.check and not args.save_baseline and not os.path.exists(args.baseline):
+        parser.error(f"pas de base ({args.baseline}) : lancer d'abord avec --save-baseline")
+
+    solver_names = args.solver or list(CLI_SOLVERS)
+    report = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'cpus': os.cpu_count(),
+        'timeout': args.timeout,
+        'results': run_benchmark(solver_names, args.timeout),
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Rapport écrit dans {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Base enregistrée dans {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Pas de base ({args.baseline}) : aucune comparaison")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(report['results'], baseline, args.tolerance)
+    for line in regressions:
+        print(f"RÉGRESSION {line}")
+    if not regressions:
+        print("Aucune régression par rapport à la base")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""BFS sur les poussées dont les états sont gardés sur disque.
+
+Pour les niveaux dont les états visités ne tiennent pas en mémoire. La
+recherche avance couche par couche (profondeur en poussées) et chaque
+couche est un fichier d'enregistrements de taille fixe (clé de l'état,
+code de la poussée qui y mène), triés par clé et lus par mmap :
+
+1. les successeurs de la couche courante sont accumulés en mémoire, et
+   chaque fois que le tampon atteint la limite de mémoire il est trié,
+   dédoublonné et écrit dans un fichier (« run ») ;
+2. les runs sont fusionnés en un seul passage et comparés, dans le même
+   passage, au fichier trié de tous les états déjà vus : les doublons
+   sont éliminés par lots, sans recherche état par état ;
+3. les nouveaux états forment la couche suivante et sont ajoutés au
+   fichier des états vus.
+
+Le chemin est reconstruit à la fin en remontant les couches : le code de
+la poussée suffit à retrouver l'état parent, cherché par dichotomie dans
+la couche précédente. Comme le BFS ordinaire, le nombre de poussées est
+minimal. Les fichiers sont écrits dans un dossier temporaire (variable
+d'environnement TMPDIR) et supprimés à la fin.
+"""
+import heapq
+import mmap
+import os
+import tempfile
+
+from bfs_parallele import CODE_BYTES, key_bytes
+from moteur import run_search
+
+# Mémoire allouée par défaut aux successeurs en attente de tri, en Mo
+DEFAULT_MEMORY_MB = 256
+
+# Place d'un successeur dans le tampon (entier Python et pointeur de liste)
+BUFFERED_STATE_BYTES = 80
+
+# Taille des fenêtres de lecture, en multiples de la granularité de mmap
+# (assez petites pour fusionner de nombreux runs à la fois)
+WINDOW_PAGES = 64
+
+# Code de la poussée de l'état de départ
+NO_PUSH = (1 << 8 * CODE_BYTES) - 1
+
+
+def _records(path, size):
+    """Enregistrements de size octets d'un fichier, dans l'ordre
+
+    Le fichier est projeté en mémoire par fenêtres successives, pour que
+    l'espace d'adressage reste borné quelle que soit sa taille.
+    """
+    length = os.path.getsize(path)
+    window = size * mmap.ALLOCATIONGRANULARITY * WINDOW_PAGES
+    with open(path, 'rb') as f:
+        for offset in range(0, length, window):
+            with mmap.mmap(f.fileno(), min(window, length - offset),
+                           access=mmap.ACCESS_READ, offset=offset) as data:
+                for start in range(0, len(data), size):
+                    yield data[start:start + size]
+
+
+def _write_run(path, items, width):
+    """Trie et dédoublonne des successeurs (clé << 32 | code), les écrit"""
+    items.sort()
+    record = width + CODE_BYTES
+    shift = 8 * CODE_BYTES
+    last = None
+    with open(path, 'wb') as f:
+        for item in items:
+            key = item >> shift
+            if key != last:
+                last = key
+                f.write(item.to_bytes(record, 'big'))
+
+
+def _merge_layer(runs, visited_path, layer_path, new_visited_path, width):
+    """Fusionne les runs en retirant les états déjà vus
+
+    Écrit la nouvelle couche et l'union des états vus, renvoie la taille
+    de la couche.
+    """
+    record = width + CODE_BYTES
+    visited = _records(visited_path, width)
+    seen = next(visited, None)
+    added = 0
+    last = None
+    with open(layer_path, 'wb') as layer, open(new_visited_path, 'wb') as union:
+        for item in heapq.merge(*(_records(path, record) for path in runs)):
+            key = item[:width]
+            if key == last:
+                continue
+            last = key
+            while seen is not None and seen < key:
+                union.write(seen)
+                seen = next(visited, None)
+            if seen == key:
+                continue
+            layer.write(item)
+            union.write(key)
+            added += 1
+        while seen is not None:
+            union.write(seen)
+            seen = next(visited, None)
+    return added
+
+
+def _lookup(path, key, width):
+    """Code de la poussée qui mène à key, cherché par dichotomie"""
+    record = width + CODE_BYTES
+    target = key.to_bytes(width, 'big')
+    with open(path, 'rb') as f:
+        low, high = 0, os.path.getsize(path) // record
+        while low < high:
+            middle = (low + high) // 2
+            f.seek(middle * record)
+            if f.read(width) < target:
+                low = middle + 1
+            else:
+                high = middle
+        f.seek(low * record + width)
+        return int.from_bytes(f.read(CODE_BYTES), 'big')
+
+
+def _parent_key(board, key, code):
+    """Clé de l'état d'où vient la poussée code menant à key"""
+    bits = key >> board.shift
+    box, direction = code >> 2, code & 3
+    pushed = board.neighbors[direction][box]
+    bits ^= board.masks[pushed] | board.masks[box]
+    player = board.cells[board.neighbors[direction ^ 1][box]]
+    return board.key(board.reachable(player, bits), bits)
+
+
+def _external_bfs_pushes(board, player, boxes, memory_bytes, directory, stats):
+    """BFS avec couches sur disque, renvoie la liste des poussées ou None"""
+    bits = board.encode_boxes(boxes)
+    if bits == board.goal_bits:
+        return []
+    width = key_bytes(board)
+    record = width + CODE_BYTES
+    mask = (1 << board.shift) - 1
+    capacity = max(1, memory_bytes // BUFFERED_STATE_BYTES)
+    stats.bytes_per_state = record + width  # Sur disque : couche et états vus
+
+    with tempfile.TemporaryDirectory(prefix="sokoban_bfs_", dir=directory) as folder:
+        start = board.key(board.reachable(player, bits), bits)
+        layers = [os.path.join(folder, "couche_0")]
+        with open(layers[0], 'wb') as f:
+            f.write(start.to_bytes(width, 'big') + NO_PUSH.to_bytes(CODE_BYTES, 'big'))
+        visited_path = os.path.join(folder, "vus_0")
+        with open(visited_path, 'wb') as f:
+            f.write(start.to_bytes(width, 'big'))
+
+        layer_size = 1
+        goal = None
+        while layer_size and goal is None:
+            depth = len(layers) - 1
+            stats.frontier(layer_size)
+            stats.reach(depth)
+
+            # Successeurs de la couche, triés par lots dans des runs
+            runs = []
+            buffer = []
+            generated = stats.generated
+            for item in _records(layers[-1], record):
+                key = int.from_bytes(item[:width], 'big')
+                bits = key >> board.shift
+                region = board.reachable(board.cells[key & mask], bits)
+                stats.expand()
+                for box, move, new_bits in board.successors(bits, region, stats):
+                    stats.generated += 1
+                    code = board.push_code(box, move)
+                    if new_bits == board.goal_bits:
+                        goal = (key, code)
+                        break
+                    child = board.key(board.reachable(box, new_bits), new_bits)
+                    buffer.append(child << 8 * CODE_BYTES | code)
+                    if len(buffer) >= capacity:
+                        runs.append(os.path.join(folder, f"run_{len(runs)}"))
+                        _write_run(runs[-1], buffer, width)
+                        buffer = []
+                if goal is not None:
+                    break
+            if goal is not None:
+                break
+            if buffer:
+                runs.append(os.path.join(folder, f"run_{len(runs)}"))
+                _write_run(runs[-1], buffer, width)
+                buffer = []
+
+            # Fusion des runs et élimination des états déjà vus
+            layers.append(os.path.join(folder, f"couche_{depth + 1}"))
+            new_visited_path = os.path.join(folder, f"vus_{depth + 1}")
+            layer_size = _merge_layer(runs, visited_path, layers[-1], new_visited_path, width)
+            stats.duplicates += stats.generated - generated - layer_size
+            for path in runs:
+                os.remove(path)
+            os.remove(visited_path)
+            visited_path = new_visited_path
+
+        if goal is None:
+            return None
+
+        # Remonte les couches depuis le parent de l'objectif
+        key, code = goal
+        codes = [code]
+        for path in reversed(layers[1:]):
+            code = _lookup(path, key, width)
+            codes.append(code)
+            key = _parent_key(board, key, code)
+        codes.reverse()
+        return board.decode_pushes(codes)
+
+
+def external_bfs_solve(game, stats=None, memory_mb=DEFAULT_MEMORY_MB, directory=None):
+    """Résout le puzzle par BFS sur les poussées, états gardés sur disque
+
+    memory_mb borne la mémoire des successeurs en attente de tri ; le
+    reste de la recherche lit les fichiers par mmap. directory est le
+    dossier des fichiers temporaires (par défaut : celui du système).
+    """
+    return run_search(game, stats, lambda board, stats: _external_bfs_pushes(
+        board, game.player, game.boxes, memory_mb * 1024 * 1024, directory, stats))
@@ -0,0 +1,215 @@
+"""BFS sur les poussées réparti sur plusieurs processus.
+
+La recherche avance couche par couche (profondeur en poussées). Chaque
+processus de travail possède une part (« shard ») de l'ensemble des états
+visités, choisie par un hachage de la clé de l'état. À chaque couche :
+
+1. chaque processus développe les états de sa part ajoutés à la couche
+   précédente et range leurs successeurs par part destinataire ;
+2. le coordinateur transmet à chaque processus les successeurs qui lui
+   reviennent ;
+3. chaque processus élimine les doublons de sa part et garde les nouveaux
+   états pour la couche suivante.
+
+Les successeurs circulent par lots d'octets de taille fixe (clé de l'état,
+clé du parent, code de la poussée) plutôt que par listes de tuples. Le
+parent de chaque état reste dans la part qui le possède : le chemin est
+reconstruit à la fin en interrogeant les parts successives.
+
+Comme le BFS ordinaire, le nombre de poussées est minimal.
+"""
+import multiprocessing
+import multiprocessing.connection
+import os
+
+from moteur import Board, SolverCancelled, bfs_solve, run_search
+
+# Octets du code d'une poussée dans un enregistrement
+CODE_BYTES = 4
+
+# Constante de mélange (Fibonacci) pour répartir les clés entre les parts
+_MIX = 0x9E3779B97F4A7C15
+
+# Pendant une couche, le rappel de progression est appelé toutes les
+# POLL_SECONDS secondes (limite de temps, annulation)
+POLL_SECONDS = 0.1
+
+
+def shard_of(key, count):
+    """Part propriétaire d'une clé d'état"""
+    return ((key * _MIX) >> 32) % count
+
+
+def key_bytes(board):
+    """Nombre d'octets d'une clé d'état pour ce niveau"""
+    return (len(board.cells) + board.shift + 7) // 8
+
+
+def _worker(conn, level_data, count):
+    """Boucle d'un processus de travail : une part des états visités"""
+    board = Board.for_level(level_data)
+    width = key_bytes(board)
+    record = 2 * width + CODE_BYTES
+    mask = (1 << board.shift) - 1
+    parents = {}   # clé -> (clé du parent, code de la poussée)
+    frontier = []
+
+    while True:
+        command, argument = conn.recv()
+
+        if command == 'seed':
+            parents[argument] = (argument, -1)
+            frontier = [argument]
+            conn.send(None)
+
+        elif command == 'expand':
+            batches = [bytearray() for _ in range(count)]
+            for key in frontier:
+                bits = key >> board.shift
+                packed = key.to_bytes(width, 'little')
+                region = board.reachable(board.cells[key & mask], bits)
+                for box, move, new_bits in board.successors(bits, region):
+                    child = board.key(board.reachable(box, new_bits), new_bits)
+                    batch = batches[shard_of(child, count)]
+                    batch += child.to_bytes(width, 'little')
+                    batch += packed
+                    batch += board.push_code(box, move).to_bytes(CODE_BYTES, 'little')
+            conn.send([bytes(batch) for batch in batches])
+
+        elif command == 'insert':
+            frontier = []
+            goal = None
+            for data in argument:
+                for start in range(0, len(data), record):
+                    child = int.from_bytes(data[start:start + width], 'little')
+                    if child in parents:
+                        continue
+                    parent = int.from_bytes(data[start + width:start + 2 * width], 'little')
+                    code = int.from_bytes(data[start + 2 * width:start + record], 'little')
+                    parents[child] = (parent, code)
+                    frontier.append(child)
+                    if goal is None and child >> board.shift == board.goal_bits:
+                        goal = child
+            conn.send((len(frontier), goal))
+
+        elif command == 'parent':
+            conn.send(parents[argument])
+
+        else:  # 'stop'
+            conn.close()
+            return
+
+
+def _receive_all(connections, stats):
+    """Réponse de chaque processus, dans l'ordre des connexions
+
+    En attendant, le rappel de stats est appelé régulièrement : il peut
+    interrompre la recherche au milieu d'une couche.
+    """
+    replies = {}
+    while len(replies) < len(connections):
+        waiting = [conn for i, conn in enumerate(connections) if i not in replies]
+        for conn in multiprocessing.connection.wait(waiting, timeout=POLL_SECONDS):
+            replies[connections.index(conn)] = conn.recv()
+        stats.poll()
+    return [replies[i] for i in range(len(connections))]
+
+
+def _parallel_bfs_pushes(board, player, boxes, workers, stats):
+    """BFS réparti sur workers processus, renvoie la liste des poussées ou None"""
+    bits = board.encode_boxes(boxes)
+    if bits == board.goal_bits:
+        return []
+    start = board.key(board.reachable(player, bits), bits)
+
+    context = multiprocessing.get_context()
+    connections = []
+    processes = []
+    try:
+        for _ in range(workers):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(target=_worker,
+                                      args=(child_conn, board.level_data, workers))
+            process.start()
+            child_conn.close()
+            connections.append(parent_conn)
+            processes.append(process)
+
+        owner = connections[shard_of(start, workers)]
+        owner.send(('seed', start))
+        owner.recv()
+
+        record = 2 * key_bytes(board) + CODE_BYTES
+        layer_size = 1
+        depth = 0
+        goal = None
+        while layer_size and goal is None:
+            stats.frontier(layer_size)
+            stats.reach(depth)
+            depth += 1
+            for conn in connections:
+                conn.send(('expand', None))
+            outgoing = _receive_all(connections, stats)
+            stats.expand(layer_size)
+            generated = sum(len(batch) for batches in outgoing for batch in batches) // record
+
+            # Chaque part reçoit les lots qui lui sont destinés
+            for shard, conn in enumerate(connections):
+                conn.send(('insert', [batches[shard] for batches in outgoing]))
+            layer_size = 0
+            for added, found in _receive_all(connections, stats):
+                layer_size += added
+                if goal is None:
+                    goal = found
+            stats.generated += generated
+            stats.duplicates += generated - layer_size
+
+        if goal is None:
+            return None
+
+        # Remonte les parents, chacun étant stocké dans la part de l'état
+        codes = []
+        key = goal
+        while True:
+            conn = connections[shard_of(key, workers)]
+            conn.send(('parent', key))
+            key, code = conn.recv()
+            if code == -1:
+                break
+            codes.append(code)
+        codes.reverse()
+        return board.decode_pushes(codes)
+
+    except SolverCancelled:
+        # Les processus sont peut-être au milieu d'une couche : inutile d'attendre
+        for process in processes:
+            process.terminate()
+        raise
+
+    finally:
+        for conn in connections:
+            try:
+                conn.send(('stop', None))
+            except OSError:
+                pass
+            conn.close()
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+
+
+def parallel_bfs_solve(game, stats=None, workers=None):
+    """Résout le puzzle par BFS sur les poussées, réparti sur plusieurs cœurs
+
+    workers est le nombre de processus (par défaut : tous les cœurs). Avec
+    un seul processus, on utilise directement bfs_solve. Les statistiques
+    sont mises à jour une fois par couche ; les élagages faits dans les
+    processus de travail n'y sont pas comptés. Le rappel de progression
+    est aussi appelé pendant chaque couche, toutes les POLL_SECONDS.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers < 2:
+        return bfs_solve(game, stats)
+    return run_search(game, stats, lambda board, stats: _parallel_bfs_pushes(
+        board, game.player, game.boxes, workers, stats))
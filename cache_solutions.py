@@ -0,0 +1,94 @@
+"""Cache disque des solutions, pour ne pas résoudre deux fois un niveau.
+
+Les entrées sont indexées par une empreinte du contenu du niveau et le nom
+du solveur. Chacune garde les mouvements (notation LURD), les statistiques
+de recherche et la date de dernière utilisation : quand le cache dépasse
+sa taille maximale, les entrées les moins récemment utilisées sont retirées.
+Lire une solution ne réécrit pas le fichier : la date d'utilisation est
+écrite avec la prochaine solution ajoutée, ou à la fin du programme.
+Le fichier est écrit à côté de scores.txt et peut être livré pré-rempli
+avec les niveaux.
+"""
+import atexit
+import hashlib
+import json
+import os
+import time
+
+from moteur import lurd_to_moves, moves_to_lurd
+
+# Fichier du cache (même dossier que scores.txt)
+CACHE_FILE = "solutions.json"
+MAX_ENTRIES = 500
+
+
+def level_hash(level_data):
+    """Empreinte du contenu d'un niveau (ses lignes)"""
+    return hashlib.sha1("\n".join(level_data).encode("utf-8")).hexdigest()
+
+
+class SolutionCache:
+    """Solutions déjà calculées, persistées dans un fichier JSON"""
+
+    def __init__(self, path=CACHE_FILE, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = self._load()
+        self.dirty = False  # Dates d'utilisation pas encore écrites
+        atexit.register(self.flush)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Cache des solutions illisible, ignoré: {e}")
+            return {}
+
+    def save(self):
+        """Écrit le cache (fichier temporaire puis remplacement)"""
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"Erreur lors de la sauvegarde du cache: {e}")
+
+    def flush(self):
+        """Écrit le cache s'il a des dates d'utilisation en attente"""
+        if self.dirty:
+            self.save()
+
+    @staticmethod
+    def key(level_data, solver_name):
+        return f"{level_hash(level_data)}:{solver_name}"
+
+    def get(self, level_data, solver_name):
+        """Mouvements en cache pour ce niveau et ce solveur, ou None"""
+        entry = self.entries.get(self.key(level_data, solver_name))
+        if entry is None:
+            return None
+        entry['last_used'] = time.time()
+        self.dirty = True
+        return lurd_to_moves(entry['moves'])
+
+    def stats(self, level_data, solver_name):
+        """Statistiques de la recherche qui a produit la solution en cache"""
+        entry = self.entries.get(self.key(level_data, solver_name))
+        return None if entry is None else entry['stats']
+
+    def put(self, level_data, solver_name, moves, stats):
+        """Ajoute une solution, en retirant les plus anciennes si besoin"""
+        self.entries[self.key(level_data, solver_name)] = {
+            'moves': moves_to_lurd(moves),
+            'stats': stats,
+            'last_used': time.time(),
+        }
+        while len(self.entries) > self.max_entries:
+            oldest = min(self.entries, key=lambda k: self.entries[k]['last_used'])
+            del self.entries[oldest]
+        self.save()
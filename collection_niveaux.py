@@ -0,0 +1,117 @@
+"""Lecture des recueils de niveaux au format standard (.xsb, .sok, .txt).
+
+Un recueil peut contenir des dizaines de milliers de niveaux : on ne les
+charge pas tous. Un premier passage sur le fichier construit un index des
+positions (octets) de chaque niveau, enregistré à côté du fichier dans
+« <fichier>.idx » et réutilisé tant que le recueil ne change pas. Le
+niveau N est ensuite lu directement à sa position.
+
+Chaque niveau est renvoyé sous forme de liste de lignes, comme dans
+niveaux.levels : « @ » devient « P », « - » et « _ » deviennent des espaces,
+« * » (caisse sur objectif) et « + » (joueur sur objectif) sont conservés.
+"""
+import json
+import os
+
+# Caractères autorisés dans une ligne de grille
+BOARD_CHARS = set("#@+$*.-_ P")
+
+# Version du format de l'index : un index d'une autre version est reconstruit
+INDEX_VERSION = 2
+
+# Conversion vers les caractères utilisés par le jeu
+_TRANSLATION = str.maketrans({'@': 'P', '-': ' ', '_': ' '})
+
+
+def is_board_line(line):
+    """La ligne (sans fin de ligne) fait-elle partie d'une grille ?"""
+    return '#' in line and set(line) <= BOARD_CHARS
+
+
+def parse_rows(text):
+    """Lignes de grille d'un niveau, converties pour le jeu"""
+    return [line.rstrip().translate(_TRANSLATION)
+            for line in text.splitlines() if line.strip()]
+
+
+class LevelCollection:
+    """Recueil de niveaux indexé, utilisable comme une liste de niveaux"""
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.entries = self._load_index()
+
+    def _signature(self):
+        stat = os.stat(self.path)
+        return [INDEX_VERSION, stat.st_size, stat.st_mtime_ns]
+
+    def _load_index(self):
+        """Charge l'index s'il est à jour, sinon le reconstruit"""
+        signature = self._signature()
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('signature') == signature:
+                    return data['levels']
+            except (OSError, ValueError, KeyError):
+                pass
+        entries = self._build_index()
+        try:
+            with open(self.index_path, 'w', encoding='utf-8') as f:
+                json.dump({'signature': signature, 'levels': entries}, f)
+        except OSError as e:
+            print(f"Index non sauvegardé: {e}")
+        return entries
+
+    def _build_index(self):
+        """Un passage sur le fichier : [début, fin, titre] de chaque niveau"""
+        entries = []
+        start = None
+        comment = ""
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+                if is_board_line(line):
+                    if start is None:
+                        start = offset
+                        title = comment
+                else:
+                    if start is not None:
+                        entries.append([start, offset, title])
+                        start = None
+                        comment = ""  # Le commentaire ne vaut que pour ce niveau
+                    stripped = line.strip()
+                    if stripped.lower().startswith('title:') and entries:
+                        entries[-1][2] = stripped[6:].strip()
+                    elif stripped.startswith(';'):
+                        comment = stripped[1:].strip()
+                    elif stripped:
+                        comment = stripped
+                offset += len(raw)
+        if start is not None:
+            entries.append([start, offset, title])
+        return entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, n):
+        start, end, _ = self.entries[n]
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            text = f.read(end - start).decode('utf-8', errors='replace')
+        return parse_rows(text)
+
+    def __iter__(self):
+        """Parcourt les niveaux dans l'ordre, en une seule lecture du fichier"""
+        with open(self.path, 'rb') as f:
+            for start, end, _ in self.entries:
+                f.seek(start)
+                yield parse_rows(f.read(end - start).decode('utf-8', errors='replace'))
+
+    def title(self, n):
+        """Titre du niveau n (commentaire ou ligne « Title: »)"""
+        return self.entries[n][2]
@@ -0,0 +1,276 @@
+"""Génération de niveaux par jeu à l'envers, notés par un solveur.
+
+Chaque niveau part de la position résolue (caisses sur les objectifs) et
+les caisses sont tirées au hasard : rejouer ces tirages à l'envers résout
+le niveau. Les candidats sont générés et résolus en parallèle sur tous
+les cœurs ; seuls ceux que le solveur résout dans le temps imparti sont
+gardés, puis classés par difficulté selon le nombre minimal de poussées.
+
+Les niveaux sont écrits au fur et à mesure, au format .xsb, dans un
+fichier par difficulté (« <préfixe>_facile.xsb », ...), lisibles avec
+collection_niveaux.LevelCollection.
+
+    python generateur.py --count 1000
+    python generateur.py --count 200 --size 10x10 --size 12x10 --boxes 4 --boxes 5
+    python generateur.py --solver BIDIR --timeout 10 --output mes_niveaux
+"""
+import argparse
+import os
+import random
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from cache_solutions import level_hash
+from moteur import Board, Game, lurd_to_moves
+from resoudre import solve_one
+
+OUTPUT_PREFIX = "niveaux_generes"
+
+# Difficultés : (nom, poussées de la solution optimale au maximum) ; la dernière
+# n'a pas de limite. Seuils réglés avec les options par défaut (environ 20 %,
+# 45 %, 25 % et 10 % des niveaux).
+DIFFICULTIES = [
+    ("facile", 5),
+    ("moyen", 8),
+    ("difficile", 11),
+    ("expert", None),
+]
+
+# Solveurs qui trouvent le nombre minimal de poussées, seuls à pouvoir noter
+# un niveau (DFS et ANYTIME peuvent rendre une solution plus longue)
+RATING_SOLVERS = ["A*", "BFS", "BFS-DISQUE", "BIDIR"]
+
+# Candidats en cours par processus : assez pour ne jamais attendre
+TASKS_PER_WORKER = 4
+
+# Grilles tirées au plus pour un niveau, avant d'abandonner
+MAX_ATTEMPTS = 1000
+
+
+def min_floor(box_count):
+    """Nombre minimal de cases de sol d'un niveau à box_count caisses"""
+    return 2 * box_count + 4
+
+
+def generate_level(width, height, box_count, seed, pulls=None):
+    """Niveau soluble obtenu en tirant les caisses depuis les objectifs
+
+    On part de la position résolue et on joue des tirages au hasard : en
+    rejouant ces tirages à l'envers, on résout le niveau. On garde la
+    position la plus éloignée des objectifs vue pendant les tirages (borne
+    inférieure du nombre de poussées, à défaut la plus tardive), et non la
+    dernière, qui laisse souvent des caisses rangées. Lève ValueError
+    si la grille est trop petite pour box_count caisses.
+    """
+    if (width - 2) * (height - 2) < min_floor(box_count):
+        raise ValueError(f"grille {width}x{height} trop petite pour {box_count} caisses")
+    rng = random.Random(seed)
+    pulls = pulls or 10 * box_count
+    for _ in range(MAX_ATTEMPTS):
+        grid = [['#'] * width for _ in range(height)]
+        for y in range(1, height - 1):
+            for x in range(1, width - 1):
+                if rng.random() > 0.15:
+                    grid[y][x] = ' '
+        floor = [(x, y) for y in range(height) for x in range(width) if grid[y][x] == ' ']
+        if len(floor) < min_floor(box_count):
+            continue
+        cells = rng.sample(floor, box_count + 1)
+        goals, player = cells[:-1], cells[-1]
+        for x, y in goals:
+            grid[y][x] = '*'
+        grid[player[1]][player[0]] = 'P'
+        board = Board([''.join(row) for row in grid])
+
+        # Le sol doit être d'un seul tenant
+        if len(board.reachable(player, 0)) != len(board.floor):
+            continue
+
+        bits = board.goal_bits
+        farthest = (0, bits, player)
+        for _ in range(pulls):
+            region = board.reachable(player, bits)
+            options = list(board.pulls(bits, region))
+            if not options:
+                break
+            _, _, bits, player = rng.choice(options)
+            distance = board.heuristic(bits)
+            if distance >= farthest[0]:
+                farthest = (distance, bits, player)
+        distance, bits, player = farthest
+        if distance == 0:
+            continue
+
+        boxes = set(board.decode_boxes(bits))
+        for y in range(height):
+            for x in range(width):
+                if grid[y][x] == '#':
+                    continue
+                goal = (x, y) in board.goals
+                if (x, y) in boxes:
+                    grid[y][x] = '*' if goal else '$'
+                elif (x, y) == player:
+                    grid[y][x] = '+' if goal else 'P'
+                else:
+                    grid[y][x] = '.' if goal else ' '
+        return [''.join(row) for row in grid]
+    raise ValueError(f"aucun niveau {width}x{height} à {box_count} caisses "
+                     f"après {MAX_ATTEMPTS} grilles")
+
+
+def difficulty(pushes):
+    """Nom de la difficulté d'un niveau résolu en pushes poussées au minimum"""
+    for name, limit in DIFFICULTIES:
+        if limit is None or pushes <= limit:
+            return name
+
+
+def count_pushes(level_data, lurd):
+    """Nombre de poussées d'une solution en notation LURD"""
+    game = Game([level_data])
+    for dx, dy in lurd_to_moves(lurd):
+        game.move(dx, dy)
+    return sum(code & 1 for code in game.history)
+
+
+def rate_level(seed, sizes, box_counts, pulls, solver_name, timeout):
+    """Génère le niveau d'une graine et le résout, renvoie un dict
+
+    La taille et le nombre de caisses sont tirés parmi ceux proposés, à
+    partir de la même graine : le résultat ne dépend que d'elle.
+    """
+    rng = random.Random(seed)
+    width, height = rng.choice(sizes)
+    box_count = rng.choice(box_counts)
+    try:
+        level = generate_level(width, height, box_count, seed, pulls)
+    except ValueError as e:
+        return {'seed': seed, 'status': "sans niveau", 'error': str(e)}
+    # Candidat jetable : sa base de motifs n'est pas enregistrée
+    Board.for_level(level).pattern_dir = None
+    result = solve_one(f"graine:{seed}", level, solver_name, timeout)
+    result['seed'] = seed
+    result['level_data'] = level
+    result['size'] = f"{width}x{height}"
+    result['boxes'] = box_count
+    if result['status'] == "résolu":
+        result['pushes'] = count_pushes(level, result['solution'])
+        result['difficulty'] = difficulty(result['pushes'])
+    return result
+
+
+def format_level(result):
+    """Texte .xsb d'un niveau noté, avec son titre et sa difficulté"""
+    rows = [row.replace('P', '@').rstrip() for row in result['level_data']]
+    return '\n'.join(rows + [
+        f"Title: Généré {result['seed']}",
+        f"; Difficulté: {result['difficulty']} - {result['length']} mouvements, "
+        f"{result['pushes']} poussées, {result['nodes']} nœuds ({result['solver']})",
+    ]) + '\n\n'
+
+
+def parse_size(text):
+    """« 10x8 » vers (10, 8)"""
+    try:
+        width, height = (int(part) for part in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"taille invalide : {text} (attendu : LARGEURxHAUTEUR)")
+    if width < 4 or height < 4:
+        raise argparse.ArgumentTypeError(f"taille trop petite : {text}")
+    return width, height
+
+
+def generate(count, sizes, box_counts, pulls, solver_name, timeout, workers,
+             first_seed, min_length, output):
+    """Génère count niveaux vérifiés, écrits au fur et à mesure
+
+    Renvoie le nombre de niveaux écrits par difficulté. On s'arrête après
+    20 * count candidats si trop de niveaux sont refusés.
+    """
+    files = {}
+    written = {name: 0 for name, _ in DIFFICULTIES}
+    seen = set()
+    accepted = 0
+    next_seed = first_seed
+    last_seed = first_seed + 20 * count
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            while accepted < count:
+                # Garde chaque processus occupé sans tout soumettre d'un coup
+                while len(pending) < TASKS_PER_WORKER * workers and next_seed < last_seed:
+                    pending.add(pool.submit(rate_level, next_seed, sizes, box_counts, pulls,
+                                            solver_name, timeout))
+                    next_seed += 1
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        result = future.result()
+                    except Exception as e:  # Processus tué (mémoire système...)
+                        print(f"Candidat perdu: {e}")
+                        continue
+                    if result['status'] != "résolu" or result['length'] < min_length:
+                        continue
+                    key = level_hash(result['level_data'])
+                    if key in seen or accepted >= count:
+                        continue
+                    seen.add(key)
+                    name = result['difficulty']
+                    if name not in files:
+                        files[name] = open(f"{output}_{name}.xsb", 'w', encoding='utf-8')
+                        files[name].write(f"; Niveaux générés ({name})\n\n")
+                    files[name].write(format_level(result))
+                    files[name].flush()
+                    written[name] += 1
+                    accepted += 1
+                    print(f"{accepted:>6}/{count} graine {result['seed']:<8} {result['size']:<6} "
+                          f"{result['boxes']} caisses {name:<10} {result['length']:>4} coups "
+                          f"{result['nodes']:>8} nœuds", flush=True)
+            for future in pending:
+                future.cancel()
+    finally:
+        for f in files.values():
+            f.close()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génération de niveaux Sokoban notés")
+    parser.add_argument('--count', type=int, default=100, help="nombre de niveaux à produire")
+    parser.add_argument('--size', type=parse_size, action='append',
+                        help="taille LARGEURxHAUTEUR (répétable, par défaut : 8x8 à 10x10)")
+    parser.add_argument('--boxes', type=int, action='append',
+                        help="nombre de caisses (répétable, par défaut : 2 à 4)")
+    parser.add_argument('--pulls', type=int, default=None,
+                        help="tirages joués à l'envers (par défaut : 10 par caisse)")
+    parser.add_argument('--solver', choices=RATING_SOLVERS, default="A*",
+                        help="solveur qui vérifie et note les niveaux")
+    parser.add_argument('--timeout', type=float, default=10,
+                        help="temps maximal de résolution par candidat, en secondes")
+    parser.add_argument('--seed', type=int, default=0, help="première graine")
+    parser.add_argument('--min-length', type=int, default=10,
+                        help="longueur minimale de la solution (en mouvements)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="nombre de processus (par défaut : tous les cœurs)")
+    parser.add_argument('--output', default=OUTPUT_PREFIX,
+                        help="préfixe des fichiers écrits (<préfixe>_<difficulté>.xsb)")
+    args = parser.parse_args(argv)
+    sizes = args.size or [(8, 8), (9, 9), (10, 10)]
+    box_counts = args.boxes or [2, 3, 4]
+    for width, height in sizes:
+        for box_count in box_counts:
+            if box_count < 1 or (width - 2) * (height - 2) < min_floor(box_count):
+                parser.error(f"taille {width}x{height} trop petite pour {box_count} caisses")
+
+    written = generate(args.count, sizes, box_counts, args.pulls, args.solver, args.timeout,
+                       args.workers or 1, args.seed, args.min_length, args.output)
+    for name, number in written.items():
+        if number:
+            print(f"{number} niveaux {name} dans {args.output}_{name}.xsb")
+    return 0 if sum(written.values()) >= args.count else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
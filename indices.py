@@ -0,0 +1,166 @@
+"""Indices : le meilleur prochain déplacement depuis n'importe quelle position.
+
+Pour chaque niveau, le moteur d'indices garde une table des positions déjà
+résolues : pour chaque état (caisses et zone du joueur), le nombre de
+poussées restantes et la prochaine poussée à jouer. Elle est remplie par
+les solutions complètes (learn) et par chaque recherche d'indice.
+
+Depuis une position de la table, l'indice est immédiat. Sinon, un A*
+pondéré part de la position et s'arrête dès qu'il rejoint la table ou les
+objectifs ; il réutilise les distances de poussée et les cases mortes
+calculées une fois par niveau (Board.for_level). La recherche est
+découpée : chaque appel à hint ne dure que budget secondes, et l'appel
+suivant reprend là où elle s'était arrêtée.
+"""
+import heapq
+import itertools
+import time
+
+from moteur import INF, Board
+
+# Temps de recherche par appel, en secondes (une fraction d'image à 30 i/s)
+HINT_BUDGET = 0.01
+
+# Poids de l'heuristique : indices plus rapides, solutions un peu plus longues
+HINT_WEIGHT = 2
+
+# Nœuds développés entre deux lectures de l'horloge
+CHECK_INTERVAL = 32
+
+# Au-delà de ce nombre d'états, la recherche d'indice abandonne
+MAX_HINT_STATES = 200000
+
+# Renvoyé par hint quand la recherche a abandonné : solution peut-être existante
+HINT_ABANDONED = "abandon"
+
+
+class HintEngine:
+    """Table des positions résolues d'un niveau et recherche d'indices"""
+
+    _cache = {}
+
+    def __init__(self, level_data):
+        self.board = Board.for_level(level_data)
+        self.solved = {}        # clé -> (poussées restantes, code de la prochaine poussée)
+        self.unsolvable = set()
+        self.abandoned = set()  # Départs où la recherche a dépassé MAX_HINT_STATES
+        self._search = None     # (clé de départ, recherche en cours)
+
+    @classmethod
+    def for_level(cls, level_data):
+        """Renvoie le moteur d'indices du niveau, créé une seule fois"""
+        key = tuple(level_data)
+        engine = cls._cache.get(key)
+        if engine is None:
+            if len(cls._cache) >= 32:
+                cls._cache.clear()
+            engine = cls._cache[key] = cls(level_data)
+        return engine
+
+    def _record(self, path, remaining):
+        """Ajoute un chemin [(clé, code de poussée)] qui finit à remaining
+        poussées de la solution"""
+        for key, code in reversed(path):
+            remaining += 1
+            known = self.solved.get(key)
+            if known is None or remaining < known[0]:
+                self.solved[key] = (remaining, code)
+
+    def learn(self, player, boxes, moves):
+        """Ajoute à la table les positions d'une solution (liste de (dx, dy))"""
+        board = self.board
+        bits = board.encode_boxes(boxes)
+        path = []
+        for dx, dy in moves:
+            target = (player[0] + dx, player[1] + dy)
+            if target in board.bit and bits & board.bit[target]:
+                pushed = (target[0] + dx, target[1] + dy)
+                path.append((board.key(board.reachable(player, bits), bits),
+                             board.push_code(target, (dx, dy))))
+                bits ^= board.bit[target] | board.bit[pushed]
+            player = target
+        if bits == board.goal_bits:
+            self._record(path, 0)
+
+    def _explore(self, player, bits, start):
+        """A* pondéré jusqu'à la table ou aux objectifs ; générateur qui
+        rend la main tous les CHECK_INTERVAL nœuds développés"""
+        board = self.board
+        solved = self.solved
+        h = board.heuristic(bits)
+        if h is None:
+            self.unsolvable.add(start)
+            return
+        counter = itertools.count()
+        parents = {start: (None, None)}
+        best_g = {start: 0}
+        heap = [(HINT_WEIGHT * h, next(counter), 0, bits, player, start)]
+        expanded = 0
+
+        while heap:
+            _, _, g, bits, player, key = heapq.heappop(heap)
+            if best_g[key] < g:
+                continue
+            expanded += 1
+            if expanded % CHECK_INTERVAL == 0:
+                yield
+            region = board.reachable(player, bits)
+            for box, move, new_bits in board.successors(bits, region):
+                state = board.key(board.reachable(box, new_bits), new_bits)
+                if best_g.get(state, INF) <= g + 1:
+                    continue
+                parents[state] = (key, board.push_code(box, move))
+                if new_bits == board.goal_bits or state in solved:
+                    path = []
+                    remaining = solved[state][0] if state in solved else 0
+                    while state != start:
+                        state, code = parents[state]
+                        path.append((state, code))
+                    path.reverse()
+                    self._record(path, remaining)
+                    return
+                new_h = board.heuristic(new_bits)
+                if new_h is None:
+                    continue
+                best_g[state] = g + 1
+                heapq.heappush(heap, (g + 1 + HINT_WEIGHT * new_h, next(counter),
+                                      g + 1, new_bits, box, state))
+            if len(best_g) > MAX_HINT_STATES:
+                self.abandoned.add(start)
+                return
+        self.unsolvable.add(start)
+
+    def hint(self, player, boxes, budget=HINT_BUDGET):
+        """Prochain déplacement (dx, dy) conseillé depuis cette position
+
+        Renvoie None si la position est résolue ou sans solution,
+        HINT_ABANDONED si la recherche a dépassé MAX_HINT_STATES états, et
+        False si elle n'a pas abouti dans le temps imparti : elle reprendra
+        à l'appel suivant.
+        """
+        board = self.board
+        bits = board.encode_boxes(boxes)
+        if bits == board.goal_bits:
+            return None
+        key = board.key(board.reachable(player, bits), bits)
+        if key in self.unsolvable:
+            return None
+        if key in self.abandoned:
+            return HINT_ABANDONED
+
+        if key not in self.solved:
+            if self._search is None or self._search[0] != key:
+                self._search = (key, self._explore(player, bits, key))
+            deadline = time.time() + budget
+            for _ in self._search[1]:
+                if time.time() > deadline:
+                    return False
+            self._search = None
+            if key in self.abandoned:
+                return HINT_ABANDONED
+            if key not in self.solved:
+                return None
+
+        (bx, by), (dx, dy) = board.decode_pushes([self.solved[key][1]])[0]
+        steps = board.walk(player, (bx - dx, by - dy), set(boxes))
+        return steps[0] if steps else (dx, dy)
@@ -0,0 +1,1650 @@
+"""Moteur de résolution du Sokoban, indépendant de pygame.
+
+La recherche se fait au niveau des poussées : un état est une configuration
+de caisses plus la zone que le joueur peut atteindre sans rien pousser.
+Cette zone est représentée par sa case la plus petite, ce qui évite de
+stocker la même disposition de caisses pour chaque case où peut se tenir
+le joueur. Les déplacements à pied sont reconstruits à la fin pour être
+rejoués avec Game.move.
+
+Les caisses sont codées par un entier dont chaque bit représente une case
+de sol : une poussée met à jour cet entier par deux XOR, sans trier ni
+recopier d'ensemble. La clé d'un état ajoute à cet entier l'indice de la
+case normalisée du joueur.
+"""
+import hashlib
+import heapq
+import itertools
+import mmap
+import os
+import re
+import sys
+import threading
+import time
+from array import array
+from collections import deque
+
+# Haut, bas, gauche, droite (même ordre que l'ancien BFS)
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+DIRECTION_INDEX = {move: i for i, move in enumerate(DIRECTIONS)}
+
+# Distance « infinie » pour une caisse qui ne peut plus atteindre un objectif
+INF = 10 ** 6
+
+# Nombre de nœuds développés entre deux appels du rappel de progression
+PROGRESS_INTERVAL = 100
+
+# Poids successifs de l'heuristique du solveur anytime (le dernier vaut 1)
+ANYTIME_WEIGHTS = (5, 2, 1.5, 1)
+
+# Dossier des bases de motifs (coût des paires de caisses), None : pas de
+# fichier. Au-delà de PATTERN_MAX_CELLS cases de sol, pas de base de motifs.
+PATTERN_DIR = "motifs"
+PATTERN_MAX_CELLS = 250
+
+# Nombre maximal de bases gardées dans PATTERN_DIR : au-delà, les moins
+# récemment utilisées sont supprimées
+PATTERN_MAX_FILES = 200
+
+# Coût d'une paire de caisses qui ne peuvent pas être rangées toutes les deux
+PAIR_INF = 0xFFFF
+
+# Au-delà de ce nombre de cases, une salle d'objectifs n'a pas de macro-poussées
+ROOM_MAX_CELLS = 120
+
+
+# Nombre maximal de mouvements gardés dans l'historique d'une partie
+HISTORY_LIMIT = 10000
+
+# Lettres de la notation LURD pour chaque direction
+MOVE_LETTERS = {(0, -1): 'u', (0, 1): 'd', (-1, 0): 'l', (1, 0): 'r'}
+LETTER_MOVES = {letter: move for move, letter in MOVE_LETTERS.items()}
+
+
+def moves_to_lurd(moves):
+    """Liste de (dx, dy) vers une chaîne LURD (« uurdl... »)"""
+    return ''.join(MOVE_LETTERS[move] for move in moves)
+
+
+def lurd_to_moves(text):
+    """Chaîne LURD (majuscules acceptées) vers une liste de (dx, dy)"""
+    return [LETTER_MOVES[letter] for letter in text.lower()]
+
+
+def run_length_encode(text):
+    """Compresse une chaîne LURD : « lllUUr » devient « 3l2Ur »"""
+    return ''.join(f"{len(run)}{letter}" if len(run) > 1 else letter
+                   for letter, run in ((letter, list(run)) for letter, run in itertools.groupby(text)))
+
+
+def run_length_decode(text):
+    """Inverse de run_length_encode : « 3l2Ur » devient « lllUUr »"""
+    return ''.join(letter * int(count or 1)
+                   for count, letter in re.findall(r'(\d*)([lurdLURD])', text))
+
+
+class SolverCancelled(Exception):
+    """Levée par un rappel de progression pour interrompre une recherche"""
+
+
+class Position:
+    """Copie figée d'une position (niveau, joueur, caisses) pour un solveur"""
+
+    def __init__(self, level_data, player, boxes):
+        self.level_data = level_data
+        self.player = player
+        self.boxes = set(boxes)
+
+
+class Grid:
+    """Niveau à plat, entouré d'une bordure de murs
+
+    La case (x, y) a l'indice (y + 1) * width + x + 1 et walls[i] vaut 1
+    pour un mur ou une case hors du niveau (lignes de longueurs
+    différentes comprises). offsets donne, dans l'ordre de DIRECTIONS, le
+    décalage d'indice vers chaque voisin : grâce à la bordure, le voisin
+    d'une case du niveau est toujours dans la grille, sans test de bornes.
+    """
+
+    def __init__(self, level_data):
+        self.width = max(len(row) for row in level_data) + 2
+        self.height = len(level_data) + 2
+        self.walls = bytearray([1]) * (self.width * self.height)
+        for y, row in enumerate(level_data):
+            for x, cell in enumerate(row):
+                if cell != '#':
+                    self.walls[self.flat(x, y)] = 0
+        self.offsets = tuple(dy * self.width + dx for dx, dy in DIRECTIONS)
+
+    def flat(self, x, y):
+        """Indice de la case (x, y), valable aussi pour la bordure"""
+        return (y + 1) * self.width + x + 1
+
+
+class Board:
+    """Partie statique d'un niveau : sol, objectifs et position de départ"""
+
+    _cache = {}
+
+    def __init__(self, level_data):
+        self.level_data = level_data
+        self.floor = set()
+        self.goals = set()
+        self.boxes = set()
+        self.player = None
+        for y, row in enumerate(level_data):
+            for x, cell in enumerate(row):
+                if cell == '#':
+                    continue
+                self.floor.add((x, y))
+                if cell in 'P@+':
+                    self.player = (x, y)
+                if cell in '$*':
+                    self.boxes.add((x, y))
+                if cell in '.*+':
+                    self.goals.add((x, y))
+        self.goal_list = sorted(self.goals)
+        self._distances = None
+        self._dead = None
+        self._pair_costs = None
+        self.pattern_dir = PATTERN_DIR  # None : base de motifs non enregistrée
+
+        # Indice et bit de chaque case de sol
+        self.cells = sorted(self.floor)
+        self.index = {cell: i for i, cell in enumerate(self.cells)}
+        self.bit = {cell: 1 << i for i, cell in enumerate(self.cells)}
+        self.masks = [1 << i for i in range(len(self.cells))]
+        self.shift = len(self.cells).bit_length()
+        self.goal_bits = self.encode_boxes(self.goals)
+
+        # Voisins de chaque case de sol, par indice : neighbors[d][i] est
+        # le voisin de la case i dans la direction d (-1 pour un mur)
+        self.grid = Grid(level_data)
+        floor_index = {self.grid.flat(x, y): i for i, (x, y) in enumerate(self.cells)}
+        self.neighbors = [
+            array('l', [floor_index.get(self.grid.flat(x, y) + offset, -1)
+                        for x, y in self.cells])
+            for offset in self.grid.offsets
+        ]
+        self.adjacent = [tuple(row[i] for row in self.neighbors if row[i] >= 0)
+                         for i in range(len(self.cells))]
+
+        # Cases de tunnel : tunnel[d >> 1][i] si la case i a un mur de chaque
+        # côté de l'axe de la direction d (vertical 0, horizontal 1)
+        self.tunnel = [
+            [self.neighbors[2][i] < 0 and self.neighbors[3][i] < 0 for i in range(len(self.cells))],
+            [self.neighbors[0][i] < 0 and self.neighbors[1][i] < 0 for i in range(len(self.cells))],
+        ]
+        self._goal_rooms = None
+        self.room_paths = []  # Codes des poussées de chaque macro-poussée de salle
+
+    @classmethod
+    def for_level(cls, level_data):
+        """Renvoie l'analyse du niveau, calculée une seule fois par niveau"""
+        key = tuple(level_data)
+        board = cls._cache.get(key)
+        if board is None:
+            if len(cls._cache) >= 32:
+                cls._cache.clear()
+            board = cls._cache[key] = cls(level_data)
+        return board
+
+    def encode_boxes(self, boxes):
+        """Entier dont les bits à 1 sont les cases des caisses"""
+        bit = self.bit
+        bits = 0
+        for box in boxes:
+            bits |= bit[box]
+        return bits
+
+    def decode_boxes(self, bits):
+        """Liste des cases des caisses codées dans bits"""
+        cells = self.cells
+        boxes = []
+        while bits:
+            low = bits & -bits
+            boxes.append(cells[low.bit_length() - 1])
+            bits ^= low
+        return boxes
+
+    def key(self, region, bits):
+        """Clé compacte d'un état : caisses et case normalisée du joueur"""
+        return (bits << self.shift) | min(region)
+
+    def encode(self, player, boxes):
+        """Clé compacte d'une position exacte (joueur non normalisé)"""
+        return (self.encode_boxes(boxes) << self.shift) | self.index[player]
+
+    def reachable(self, player, bits):
+        """Indices des cases accessibles au joueur sans pousser de caisse"""
+        adjacent = self.adjacent
+        masks = self.masks
+        start = self.index[player]
+        seen = {start}
+        stack = [start]
+        while stack:
+            for j in adjacent[stack.pop()]:
+                if j not in seen and not bits & masks[j]:
+                    seen.add(j)
+                    stack.append(j)
+        return seen
+
+    def pushes(self, bits, region):
+        """Poussées possibles depuis la zone du joueur (indices de cases)
+
+        Renvoie des triplets (caisse, direction, nouvelles caisses).
+        """
+        cells = self.cells
+        masks = self.masks
+        neighbors = self.neighbors
+        rest = bits
+        while rest:
+            low = rest & -rest
+            rest ^= low
+            i = low.bit_length() - 1
+            for d in range(4):
+                dest = neighbors[d][i]
+                # d ^ 1 : direction opposée (haut/bas, gauche/droite)
+                if dest < 0 or bits & masks[dest] or neighbors[d ^ 1][i] not in region:
+                    continue
+                yield cells[i], DIRECTIONS[d], bits ^ low ^ masks[dest]
+
+    @property
+    def distances(self):
+        """Pour chaque case, nombre minimal de poussées vers chaque objectif
+
+        Calculé une fois par niveau en tirant une caisse depuis chaque
+        objectif, sans tenir compte des autres caisses.
+        """
+        if self._distances is None:
+            floor = self.floor
+            table = {cell: [INF] * len(self.goal_list) for cell in floor}
+            for i, goal in enumerate(self.goal_list):
+                table[goal][i] = 0
+                queue = deque([goal])
+                while queue:
+                    x, y = queue.popleft()
+                    d = table[(x, y)][i] + 1
+                    for dx, dy in DIRECTIONS:
+                        # La caisse venait de (x-dx, y-dy), poussée depuis (x-2dx, y-2dy)
+                        prev = (x - dx, y - dy)
+                        if (prev in floor and (x - 2 * dx, y - 2 * dy) in floor
+                                and table[prev][i] > d):
+                            table[prev][i] = d
+                            queue.append(prev)
+            self._distances = table
+        return self._distances
+
+    @property
+    def dead(self):
+        """Cases mortes : une caisse poussée là n'atteint plus aucun objectif"""
+        if self._dead is None:
+            self._dead = {cell for cell, row in self.distances.items()
+                          if min(row, default=INF) >= INF}
+        return self._dead
+
+    def is_frozen(self, bits, cell, fixed=0):
+        """La caisse en cell est-elle bloquée sur les deux axes ?
+
+        fixed code les caisses déjà examinées, traitées comme des murs
+        pour couper la récursion.
+        """
+        bit = self.bit
+        dead = self.dead
+        fixed |= bit[cell]
+        x, y = cell
+        for dx, dy in ((1, 0), (0, 1)):
+            before = (x - dx, y - dy)
+            after = (x + dx, y + dy)
+            b_before = bit.get(before)
+            b_after = bit.get(after)
+            if (b_before is None or b_after is None
+                    or fixed & b_before or fixed & b_after):
+                continue  # Mur d'un côté
+            if before in dead and after in dead:
+                continue  # Bouger sur cet axe mène à une case morte
+            if bits & b_before and self.is_frozen(bits, before, fixed):
+                continue
+            if bits & b_after and self.is_frozen(bits, after, fixed):
+                continue
+            return False
+        return True
+
+    def is_deadlock(self, bits, box):
+        """La poussée qui vient d'amener une caisse en box est-elle perdue ?
+
+        Vérifie la case morte, puis le gel de la caisse et de ses voisines
+        (blocs 2x2, paires de caisses contre un mur...) hors objectifs.
+        """
+        if box in self.dead:
+            return True
+        bit = self.bit
+        free = bits & ~self.goal_bits  # Caisses hors objectif
+        x, y = box
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                cell = (x + dx, y + dy)
+                b = bit.get(cell)
+                if b is not None and free & b and self.is_frozen(bits, cell):
+                    return True
+        return False
+
+    def pulls(self, bits, region):
+        """Tirages possibles depuis la zone du joueur (recherche arrière)
+
+        Renvoie des quadruplets (caisse, direction, nouvelles caisses,
+        nouvelle case du joueur) : le joueur, du côté direction de la
+        caisse, recule d'une case et la caisse le suit.
+        """
+        cells = self.cells
+        masks = self.masks
+        neighbors = self.neighbors
+        rest = bits
+        while rest:
+            low = rest & -rest
+            rest ^= low
+            i = low.bit_length() - 1
+            for d in range(4):
+                cell = neighbors[d][i]
+                if cell not in region:
+                    continue
+                back = neighbors[d][cell]
+                if back >= 0 and not bits & masks[back]:
+                    yield cells[i], DIRECTIONS[d], bits ^ low ^ masks[cell], cells[back]
+
+    def goal_regions(self):
+        """Une case par zone du joueur quand toutes les caisses sont rangées"""
+        seen = set()
+        starts = []
+        for i, cell in enumerate(self.cells):
+            if i in seen or self.goal_bits & self.masks[i]:
+                continue
+            seen |= self.reachable(cell, self.goal_bits)
+            starts.append(cell)
+        return starts
+
+    def successors(self, bits, region, stats=None):
+        """Poussées (caisse, direction, nouvelles caisses) sans impasse
+
+        Les poussées écartées sont comptées dans stats.pruned.
+        """
+        for box, (dx, dy), new_bits in self.pushes(bits, region):
+            if not self.is_deadlock(new_bits, (box[0] + dx, box[1] + dy)):
+                yield box, (dx, dy), new_bits
+            elif stats is not None:
+                stats.pruned += 1
+
+    def articulation_points(self):
+        """Cases de sol qui coupent le niveau en deux (algorithme de Tarjan)"""
+        adjacent = self.adjacent
+        order = [-1] * len(self.cells)
+        low = [0] * len(self.cells)
+        points = set()
+        counter = 0
+        for root in range(len(self.cells)):
+            if order[root] >= 0:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            root_children = 0
+            stack = [(root, -1, iter(adjacent[root]))]
+            while stack:
+                cell, parent, rest = stack[-1]
+                for j in rest:
+                    if order[j] < 0:
+                        order[j] = low[j] = counter
+                        counter += 1
+                        stack.append((j, cell, iter(adjacent[j])))
+                        break
+                    if j != parent:
+                        low[cell] = min(low[cell], order[j])
+                else:
+                    stack.pop()
+                    if parent < 0:
+                        continue
+                    low[parent] = min(low[parent], low[cell])
+                    if parent == root:
+                        root_children += 1
+                    elif low[cell] >= order[parent]:
+                        points.add(parent)
+            if root_children >= 2:
+                points.add(root)
+        return points
+
+    @property
+    def goal_rooms(self):
+        """Salles d'objectifs : {(entrée, direction): (cases, préfixes, macros)}
+
+        Une salle est une zone sans caisse au départ, reliée au reste du
+        niveau par une seule case (l'entrée, point d'articulation) et qui
+        contient des objectifs. On y range les caisses dans un ordre fixé
+        une fois par niveau, les plus profonds d'abord, en vérifiant que
+        chaque caisse poussée depuis l'entrée atteint son objectif.
+        préfixes associe les caisses déjà rangées (masque) au rang du
+        prochain objectif ; macros[k] est (code, case finale du joueur,
+        objectif, poussées) de la caisse de rang k.
+        """
+        if self._goal_rooms is None:
+            rooms = {}
+            paths = []
+            goal_indices = {self.index[goal] for goal in self.goals}
+            box_indices = {self.index[box] for box in self.boxes}
+            for entrance in self.articulation_points():
+                if entrance in goal_indices:
+                    continue
+                seen = {entrance}
+                for start in self.adjacent[entrance]:
+                    if start in seen:
+                        continue
+                    room = {start}
+                    stack = [start]
+                    while stack:
+                        for j in self.adjacent[stack.pop()]:
+                            if j not in room and j != entrance:
+                                room.add(j)
+                                stack.append(j)
+                    seen |= room
+                    if (room & box_indices or not room & goal_indices
+                            or len(room) > ROOM_MAX_CELLS):
+                        continue
+                    for d in range(4):
+                        if self.neighbors[d][entrance] in room and self.neighbors[d ^ 1][entrance] >= 0:
+                            entry = self._fill_room(room, room & goal_indices, entrance, d, paths)
+                            if entry is not None:
+                                rooms[(entrance, d)] = entry
+            self.room_paths = paths
+            self._goal_rooms = rooms
+        return self._goal_rooms
+
+    def _fill_room(self, room, goals, entrance, d, paths):
+        """Ordre de remplissage d'une salle entrée dans la direction d, ou None
+
+        Les codes des poussées de chaque macro-poussée sont ajoutés à paths.
+        """
+        # Les objectifs les plus éloignés de l'entrée d'abord
+        depth = {entrance: 0}
+        queue = deque([entrance])
+        while queue:
+            i = queue.popleft()
+            for j in self.adjacent[i]:
+                if j in room and j not in depth:
+                    depth[j] = depth[i] + 1
+                    queue.append(j)
+        remaining = sorted(goals, key=lambda goal: -depth[goal])
+        mask = 0
+        for i in room:
+            mask |= self.masks[i]
+        prefixes = {}
+        macros = []
+        filled = 0
+        while remaining:
+            for goal in remaining:
+                path = self._room_push_path(room, filled, entrance, d, goal)
+                if path is not None:
+                    break
+            else:
+                return None
+            prefixes[filled] = len(macros)
+            paths.append(path)
+            code = 4 * len(self.cells) ** 2 + len(paths) - 1
+            macros.append((code, path[-1] >> 2, goal, len(path)))
+            filled |= self.masks[goal]
+            remaining.remove(goal)
+        return mask, prefixes, macros
+
+    def _room_push_path(self, room, filled, entrance, d, goal):
+        """Codes des poussées les plus courtes d'une caisse de l'entrée à
+        goal, le joueur venant de l'extérieur ; None si impossible
+
+        Les caisses de filled restent en place ; ni la caisse ni le joueur
+        ne ressortent de la salle.
+        """
+        neighbors = self.neighbors
+        masks = self.masks
+        outside = neighbors[d ^ 1][entrance]
+        walkable = {i for i in room if not filled & masks[i]} | {entrance, outside}
+
+        def region(box, player):
+            seen = {player}
+            stack = [player]
+            while stack:
+                for j in self.adjacent[stack.pop()]:
+                    if j not in seen and j != box and j in walkable:
+                        seen.add(j)
+                        stack.append(j)
+            return seen
+
+        start = (entrance, min(region(entrance, outside)))
+        parents = {start: None}
+        queue = deque([(entrance, outside, start)])
+        while queue:
+            box, player, state = queue.popleft()
+            reach = region(box, player)
+            for e in range(4):
+                dest = neighbors[e][box]
+                if dest not in room or filled & masks[dest] or neighbors[e ^ 1][box] not in reach:
+                    continue
+                new_state = (dest, min(region(dest, box)))
+                if new_state in parents:
+                    continue
+                parents[new_state] = (state, box * 4 + e)
+                if dest == goal:
+                    codes = []
+                    while parents[new_state] is not None:
+                        new_state, code = parents[new_state]
+                        codes.append(code)
+                    codes.reverse()
+                    return codes
+                queue.append((dest, box, new_state))
+        return None
+
+    def macro_successors(self, bits, region, stats=None):
+        """Poussées et macro-poussées sans impasse : quadruplets (case
+        finale du joueur, code, nombre de poussées, nouvelles caisses)
+
+        Une caisse poussée dans un tunnel y glisse jusqu'à sa dernière
+        case (ou un objectif), le joueur derrière elle : dans le tunnel,
+        elle bloque le passage et ne peut qu'avancer ou reculer. Une caisse
+        poussée depuis l'entrée d'une salle d'objectifs va directement au
+        prochain objectif de l'ordre de remplissage, si les caisses déjà
+        dans la salle sont rangées dans cet ordre.
+        """
+        cells = self.cells
+        masks = self.masks
+        neighbors = self.neighbors
+        rooms = self.goal_rooms
+        goal_bits = self.goal_bits
+        dead = self.dead
+        steps_code = 4 * len(cells)
+        for box, move, new_bits in self.successors(bits, region, stats):
+            start = self.index[box]
+            d = DIRECTION_INDEX[move]
+            room = rooms.get((start, d))
+            if room is not None:
+                mask, prefixes, macros = room
+                rank = prefixes.get(bits & mask)
+                if rank is not None:
+                    code, player, goal, cost = macros[rank]
+                    yield cells[player], code, cost, bits ^ masks[start] ^ masks[goal]
+                    continue
+
+            # Glissement dans le tunnel, arrêté avant une entrée de salle
+            tunnel = self.tunnel[d >> 1]
+            i, j = start, neighbors[d][start]
+            while tunnel[j] and not goal_bits & masks[j] and (j, d) not in rooms:
+                after = neighbors[d][j]
+                if after < 0 or not tunnel[after] or new_bits & masks[after] or cells[after] in dead:
+                    break
+                slid = new_bits ^ masks[j] ^ masks[after]
+                if self.is_deadlock(slid, cells[after]):
+                    break
+                new_bits = slid
+                i, j = j, after
+            steps = abs(cells[j][0] - cells[start][0]) + abs(cells[j][1] - cells[start][1])
+            yield cells[i], (steps - 1) * steps_code + start * 4 + d, steps, new_bits
+
+    @property
+    def pair_costs(self):
+        """Base de motifs : coût exact de chaque paire de caisses
+
+        pair_costs[i * n + j] est le nombre minimal de poussées pour ranger
+        deux caisses placées sur les cases i et j (les autres caisses
+        ignorées). None tant que load_patterns ne l'a pas chargée, False si
+        le niveau est trop grand ou a moins de deux objectifs.
+        """
+        return self._pair_costs
+
+    def load_patterns(self, stats=None):
+        """Charge la base de motifs si ce n'est pas déjà fait, la renvoie
+
+        Lue depuis pattern_dir, ou calculée puis enregistrée (pattern_dir
+        None : pas d'enregistrement). Le calcul appelle le rappel de stats, qui
+        peut l'interrompre par SolverCancelled : la base reste à charger.
+        """
+        if self._pair_costs is None:
+            if len(self.goal_list) < 2 or len(self.cells) > PATTERN_MAX_CELLS:
+                self._pair_costs = False
+            else:
+                self._pair_costs = load_pair_costs(self, self.pattern_dir, stats)
+        return self._pair_costs
+
+    def heuristic(self, bits):
+        """Borne inférieure du nombre de poussées restantes, None si bloqué
+
+        Coût minimal d'une affectation des caisses aux objectifs
+        (algorithme hongrois sur les distances de poussée), relevé par la
+        base de motifs, si elle est chargée, quand les paires de caisses
+        coûtent plus cher.
+        """
+        boxes = self.decode_boxes(bits)
+        if len(boxes) > len(self.goal_list):
+            return None
+        distances = self.distances
+        cost = min_cost_assignment([distances[box] for box in boxes])
+        if cost >= INF:
+            return None
+        pairs = self.pair_costs
+        if pairs and len(boxes) >= 2:
+            pair_cost = self._pair_bound([self.index[box] for box in boxes], pairs)
+            if pair_cost is None:
+                return None
+            cost = max(cost, pair_cost)
+        return cost
+
+    def _pair_bound(self, boxes, pairs):
+        """Borne inférieure par la base de motifs, None si une paire est bloquée
+
+        Les caisses sont groupées par paires disjointes, en commençant par
+        celles qui coûtent le plus par rapport à leurs caisses seules : la
+        somme des coûts des groupes ne dépasse pas le coût réel.
+        """
+        n = len(self.cells)
+        distances = self.distances
+        cells = self.cells
+        single = {i: min(distances[cells[i]]) for i in boxes}
+        gains = []
+        for a, b in itertools.combinations(boxes, 2):
+            cost = pairs[a * n + b]
+            if cost == PAIR_INF:
+                return None
+            gain = cost - single[a] - single[b]
+            if gain > 0:
+                gains.append((gain, a, b))
+        total = sum(single.values())
+        used = set()
+        for gain, a, b in sorted(gains, reverse=True):
+            if a not in used and b not in used:
+                used.add(a)
+                used.add(b)
+                total += gain
+        return total
+
+    def walk(self, start, target, boxes):
+        """Plus court chemin à pied entre deux cases, en liste de (dx, dy)"""
+        if start == target:
+            return []
+        floor = self.floor
+        parents = {start: None}
+        queue = deque([start])
+        while queue:
+            x, y = queue.popleft()
+            for dx, dy in DIRECTIONS:
+                cell = (x + dx, y + dy)
+                if cell in parents or cell not in floor or cell in boxes:
+                    continue
+                parents[cell] = ((x, y), (dx, dy))
+                if cell == target:
+                    moves = []
+                    while parents[cell] is not None:
+                        cell, move = parents[cell]
+                        moves.append(move)
+                    moves.reverse()
+                    return moves
+                queue.append(cell)
+        return None
+
+    def push_code(self, box, move):
+        """Code entier d'une poussée : indice de la caisse et direction"""
+        return self.index[box] * 4 + DIRECTION_INDEX[move]
+
+    def decode_pushes(self, codes):
+        """Liste de (caisse, direction) à partir des codes de poussée
+
+        Les macro-poussées sont développées : au-delà de 4 * n (n cases de
+        sol), le code d'un glissement de k poussées dans une direction est
+        (k - 1) * 4 * n + celui de sa première poussée ; au-delà de 4 * n²,
+        c'est une poussée de salle d'objectifs (room_paths).
+        """
+        cells = self.cells
+        steps_code = 4 * len(cells)
+        pushes = []
+        for code in codes:
+            if code >= steps_code * len(cells):
+                pushes.extend(self.decode_pushes(self.room_paths[code - steps_code * len(cells)]))
+                continue
+            steps, code = divmod(code, steps_code)
+            box, d = code >> 2, code & 3
+            for _ in range(steps + 1):
+                pushes.append((cells[box], DIRECTIONS[d]))
+                box = self.neighbors[d][box]
+        return pushes
+
+    def expand_pushes(self, player, boxes, pushes):
+        """Convertit une suite de poussées en déplacements pas à pas"""
+        boxes = set(boxes)
+        moves = []
+        for (bx, by), (dx, dy) in pushes:
+            moves.extend(self.walk(player, (bx - dx, by - dy), boxes))
+            moves.append((dx, dy))
+            boxes.remove((bx, by))
+            boxes.add((bx + dx, by + dy))
+            player = (bx, by)
+        return moves
+
+
+class Game:
+    """Partie en cours : niveau, joueur, caisses, objectifs et historique
+
+    Les règles de déplacement sont ici, sans affichage ni son. L'interface
+    peut redéfinir on_push et on_solved pour réagir à ces événements.
+
+    L'historique ne garde qu'un petit entier par mouvement : indice de la
+    direction * 2 + 1 si une caisse a été poussée. Les cases de la caisse
+    s'en déduisent (elle était devant le joueur et a avancé d'une case),
+    ce qui permet d'annuler et de refaire en temps constant. Seuls les
+    HISTORY_LIMIT derniers mouvements sont gardés.
+    """
+
+    def __init__(self, levels, level_index=0):
+        self.levels = levels
+        self.level_index = level_index
+        self.level_data = levels[level_index]
+        self.reset()
+
+    def load_level(self, level_index):
+        if 0 <= level_index < len(self.levels):
+            self.level_index = level_index
+            self.level_data = self.levels[level_index]
+            self.reset()
+
+    def reset(self):
+        # Grille, joueur, caisses et objectifs lus une seule fois par niveau
+        board = Board.for_level(self.level_data)
+        self.grid = board.grid
+        self.player = board.player
+        self.boxes = set(board.boxes)
+        self.goals = set(board.goals)
+        self.victory_played = False
+        self.history = deque(maxlen=HISTORY_LIMIT)
+        self.redo_stack = []
+
+    def undo_move(self):
+        """Annule le dernier mouvement"""
+        if not self.history:
+            return False
+        code = self.history.pop()
+        dx, dy = DIRECTIONS[code >> 1]
+        px, py = self.player
+        if code & 1:
+            # La caisse poussée revient sur la case du joueur
+            self.boxes.remove((px + dx, py + dy))
+            self.boxes.add((px, py))
+        self.player = (px - dx, py - dy)
+        self.redo_stack.append(code)
+        return True
+
+    def redo_move(self):
+        """Refait le dernier mouvement annulé"""
+        if not self.redo_stack:
+            return False
+        code = self.redo_stack.pop()
+        self._step(*DIRECTIONS[code >> 1])
+        self.history.append(code)
+        if code & 1:
+            self.on_push()
+        return True
+
+    def export_moves(self):
+        """Mouvements de l'historique en LURD compressé (poussées en majuscules)"""
+        letters = (MOVE_LETTERS[DIRECTIONS[code >> 1]] for code in self.history)
+        lurd = ''.join(letter.upper() if code & 1 else letter
+                       for letter, code in zip(letters, self.history))
+        return run_length_encode(lurd)
+
+    def _step(self, dx, dy):
+        """Applique un pas ; None si bloqué, sinon True si une caisse a bougé"""
+        px, py = self.player
+        nx, ny = px + dx, py + dy
+        grid = self.grid
+
+        # Vérifier mur (la bordure de la grille évite les tests de bornes)
+        if grid.walls[grid.flat(nx, ny)]:
+            return None
+
+        box_pushed = False
+
+        # Vérifier boîte
+        if (nx, ny) in self.boxes:
+            bx, by = nx + dx, ny + dy
+            if grid.walls[grid.flat(bx, by)] or (bx, by) in self.boxes:
+                return None
+            self.boxes.remove((nx, ny))
+            self.boxes.add((bx, by))
+            box_pushed = True
+
+        self.player = (nx, ny)
+        return box_pushed
+
+    def move(self, dx, dy):
+        box_pushed = self._step(dx, dy)
+        if box_pushed is None:
+            return False
+
+        # Garder le mouvement dans l'historique ; il n'y a plus rien à refaire
+        self.history.append(DIRECTION_INDEX[(dx, dy)] * 2 + box_pushed)
+        self.redo_stack.clear()
+        if box_pushed:
+            self.on_push()
+        return True
+
+    def move_silent(self, dx, dy):
+        """Version du mouvement sans historique ni son, pour l'IA"""
+        return self._step(dx, dy) is not None
+
+    def is_solved(self):
+        solved = self.boxes == self.goals
+        # Prévenir l'interface une seule fois
+        if solved and not self.victory_played:
+            self.on_solved()
+            self.victory_played = True
+        return solved
+
+    def get_state(self):
+        """Clé compacte (entier) de la position courante"""
+        return Board.for_level(self.level_data).encode(self.player, self.boxes)
+
+    def on_push(self):
+        """Appelé après chaque poussée de caisse par move"""
+
+    def on_solved(self):
+        """Appelé la première fois que is_solved constate la victoire"""
+
+
+class SearchStats:
+    """Statistiques d'une recherche, remplies par les solveurs
+
+    callback, s'il est donné, est appelé avec l'objet lui-même tous les
+    interval nœuds développés ; il peut lever SolverCancelled pour
+    interrompre la recherche. phases donne la durée de chaque phase
+    (analyse du niveau, recherche, reconstruction des déplacements).
+    """
+
+    def __init__(self, callback=None, interval=PROGRESS_INTERVAL):
+        self.callback = callback
+        self.interval = interval
+        self.expanded = 0        # Nœuds développés
+        self.generated = 0       # Successeurs produits
+        self.duplicates = 0      # Successeurs déjà vus
+        self.pruned = 0          # Successeurs écartés (impasse, heuristique)
+        self.peak_frontier = 0   # Taille maximale de la file (pile pour les DFS)
+        self.depth = 0           # Profondeur maximale atteinte, en poussées
+        self.bytes_per_state = 0
+        self.phases = {}
+        self.start_time = time.time()
+        self._phase = None
+        self._phase_start = None
+
+    def expand(self, count=1):
+        """Compte count nœuds développés et appelle le rappel si besoin"""
+        before = self.expanded
+        self.expanded += count
+        if self.callback is not None and self.expanded // self.interval != before // self.interval:
+            self.callback(self)
+
+    def poll(self):
+        """Appelle le rappel sans compter de nœud (analyse du niveau)"""
+        if self.callback is not None:
+            self.callback(self)
+
+    def frontier(self, size):
+        """Note la taille de la frontière"""
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+
+    def reach(self, depth):
+        """Note la profondeur atteinte"""
+        if depth > self.depth:
+            self.depth = depth
+
+    def phase(self, name):
+        """Termine la phase en cours et commence la phase name"""
+        now = time.time()
+        if self._phase is not None:
+            self.phases[self._phase] = self.phases.get(self._phase, 0) + now - self._phase_start
+        self._phase = name
+        self._phase_start = now
+
+    def finish(self):
+        """Termine la phase en cours"""
+        self.phase(None)
+
+    def measure(self, states, arena=None):
+        """Estime la mémoire par état d'un ensemble (ou dict) d'états vus"""
+        if not states:
+            return
+        total = sys.getsizeof(states) + sum(sys.getsizeof(key) for key in states)
+        if arena is not None:
+            total += arena.nbytes()
+        self.bytes_per_state = total // len(states)
+
+    @property
+    def elapsed(self):
+        return time.time() - self.start_time
+
+    def counters(self):
+        """Compteurs seuls, sans les durées des phases : lisibles depuis un
+        autre thread pendant la recherche (affichage en cours de partie)"""
+        return {
+            'expanded': self.expanded,
+            'generated': self.generated,
+            'duplicates': self.duplicates,
+            'pruned': self.pruned,
+            'peak_frontier': self.peak_frontier,
+            'depth': self.depth,
+            'bytes_per_state': self.bytes_per_state,
+        }
+
+    def as_dict(self):
+        """Statistiques sous forme de dict (cache des solutions, rapports)
+
+        Parcourt phases, que le thread du solveur modifie : à n'appeler
+        qu'une fois la recherche terminée.
+        """
+        return dict(self.counters(),
+                    phases={name: round(seconds, 4) for name, seconds in self.phases.items()})
+
+
+class NodeArena:
+    """Arbre de recherche stocké dans deux tableaux d'entiers
+
+    Chaque nœud ne garde que l'indice de son parent et le code de la
+    poussée qui y mène ; le chemin n'est reconstruit qu'une fois, quand
+    la solution est trouvée. Le nœud 0 est la position de départ.
+    """
+
+    def __init__(self):
+        self.parents = array('l', [-1])
+        self.pushes = array('l', [-1])
+
+    def __len__(self):
+        return len(self.parents)
+
+    def add(self, parent, push):
+        """Ajoute un nœud et renvoie son indice"""
+        self.parents.append(parent)
+        self.pushes.append(push)
+        return len(self.parents) - 1
+
+    def nbytes(self):
+        """Mémoire occupée par les deux tableaux"""
+        return (len(self.parents) + len(self.pushes)) * self.parents.itemsize
+
+    def add_root(self):
+        """Ajoute une racine supplémentaire (recherche à plusieurs départs)"""
+        return self.add(-1, -1)
+
+    def path(self, node):
+        """Codes des poussées de la racine jusqu'au nœud"""
+        codes = []
+        while self.parents[node] != -1:
+            codes.append(self.pushes[node])
+            node = self.parents[node]
+        codes.reverse()
+        return codes
+
+
+def build_pair_costs(board, stats=None):
+    """Calcule la base de motifs d'un niveau (tableau de n * n entiers)
+
+    Recherche en largeur à l'envers sur les positions à deux caisses :
+    on part des deux caisses sur deux objectifs (joueur dans chaque zone
+    possible) et on tire. La première visite d'une paire de cases donne
+    son coût minimal. Le rappel de stats est appelé tous les
+    PROGRESS_INTERVAL états.
+    """
+    n = len(board.cells)
+    costs = array('H', [PAIR_INF]) * (n * n)
+    masks = board.masks
+    goals = [board.index[goal] for goal in board.goal_list]
+    seen = set()
+    queue = deque()
+    for a, b in itertools.combinations(goals, 2):
+        costs[a * n + b] = costs[b * n + a] = 0
+        bits = masks[a] | masks[b]
+        covered = set()
+        for i in range(n):
+            if i in covered or bits & masks[i]:
+                continue
+            region = board.reachable(board.cells[i], bits)
+            covered |= region
+            seen.add(board.key(region, bits))
+            queue.append((bits, region, 0))
+
+    visited = 0
+    while queue:
+        bits, region, depth = queue.popleft()
+        visited += 1
+        if stats is not None and visited % PROGRESS_INTERVAL == 0:
+            stats.poll()
+        for _, _, new_bits, player in board.pulls(bits, region):
+            new_region = board.reachable(player, new_bits)
+            state = board.key(new_region, new_bits)
+            if state in seen:
+                continue
+            seen.add(state)
+            low = new_bits & -new_bits
+            a = low.bit_length() - 1
+            b = (new_bits ^ low).bit_length() - 1
+            if costs[a * n + b] == PAIR_INF:
+                costs[a * n + b] = costs[b * n + a] = depth + 1
+            queue.append((new_bits, new_region, depth + 1))
+    return costs
+
+
+def load_pair_costs(board, directory, stats=None):
+    """Base de motifs du niveau, lue par mmap si elle est déjà sur disque
+
+    Sinon elle est calculée (voir build_pair_costs pour stats) puis
+    enregistrée dans directory, sous le nom de l'empreinte du niveau
+    (directory None : pas d'enregistrement). Le dossier garde au plus
+    PATTERN_MAX_FILES bases.
+    """
+    if directory is None:
+        return build_pair_costs(board, stats)
+    n = len(board.cells)
+    digest = hashlib.sha1("\n".join(board.level_data).encode("utf-8")).hexdigest()
+    path = os.path.join(directory, digest + ".pdb")
+    # En-tête : ordre des octets des entiers puis nombre de cases
+    header = f"PDB {sys.byteorder} {n}\n".encode("ascii")
+    size = len(header) + 2 * n * n
+    if os.path.exists(path) and os.path.getsize(path) == size:
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if data[:len(header)] == header:
+            os.utime(path)  # Date de dernière utilisation, pour l'éviction
+            return memoryview(data)[len(header):].cast('H')
+        data.close()
+
+    costs = build_pair_costs(board, stats)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            costs.tofile(f)
+        os.replace(tmp_path, path)
+        _evict_patterns(directory, PATTERN_MAX_FILES)
+    except OSError as e:
+        print(f"Base de motifs non sauvegardée: {e}")
+    return costs
+
+
+def _evict_patterns(directory, keep):
+    """Supprime les bases de motifs les moins récemment utilisées de
+    directory pour n'en garder que keep"""
+    paths = [os.path.join(directory, name) for name in os.listdir(directory)
+             if name.endswith(".pdb")]
+    if len(paths) <= keep:
+        return
+    paths.sort(key=os.path.getmtime)
+    for path in paths[:len(paths) - keep]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # Base en cours de lecture par un autre processus (Windows)
+
+
+def min_cost_assignment(cost):
+    """Coût minimal d'une affectation des lignes aux colonnes (hongrois)
+
+    cost est une matrice n x m avec n <= m.
+    """
+    n = len(cost)
+    if n == 0:
+        return 0
+    m = len(cost[0])
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    match = [0] * (m + 1)  # match[j] : ligne affectée à la colonne j
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        match[0] = i
+        j0 = 0
+        minv = [float('inf')] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = match[j0]
+            row = cost[i0 - 1]
+            delta = float('inf')
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if match[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+    return sum(cost[match[j] - 1][j - 1] for j in range(1, m + 1) if match[j])
+
+
+def _bfs_pushes(board, player, boxes, stats):
+    """BFS sur les poussées, renvoie la liste des poussées ou None"""
+    bits = board.encode_boxes(boxes)
+    if bits == board.goal_bits:
+        return []
+    arena = NodeArena()
+    queue = deque([(bits, player, 0, 0)])
+    visited = {board.key(board.reachable(player, bits), bits)}
+
+    while queue:
+        stats.frontier(len(queue))
+        bits, player, node, depth = queue.popleft()
+        region = board.reachable(player, bits)
+        stats.reach(depth)
+        stats.expand()
+
+        for box, move, new_bits in board.successors(bits, region, stats):
+            stats.generated += 1
+            if new_bits == board.goal_bits:
+                child = arena.add(node, board.push_code(box, move))
+                stats.measure(visited, arena)
+                return board.decode_pushes(arena.path(child))
+            state = board.key(board.reachable(box, new_bits), new_bits)
+            if state in visited:
+                stats.duplicates += 1
+                continue
+            visited.add(state)
+            child = arena.add(node, board.push_code(box, move))
+            queue.append((new_bits, box, child, depth + 1))
+
+    stats.measure(visited, arena)
+    return None
+
+
+def analyse_level(game, stats, patterns=False):
+    """Phase « analyse » : analyse du niveau, calculée une fois par niveau
+
+    Avec patterns, charge aussi la base de motifs de l'heuristique ; son
+    calcul peut être interrompu par le rappel de stats.
+    """
+    stats.phase("analyse")
+    board = Board.for_level(game.level_data)
+    board.dead  # Distances et cases mortes
+    board.goal_rooms  # Tunnels et salles d'objectifs (macro-poussées)
+    if patterns:
+        board.load_patterns(stats)
+    return board
+
+
+def run_search(game, stats, search, patterns=False):
+    """Analyse du niveau, recherche des poussées puis reconstruction des
+    déplacements, chaque phase étant chronométrée dans stats
+
+    search(board, stats) renvoie la liste des poussées, ou une valeur
+    fausse s'il n'y a pas de solution. patterns : voir analyse_level.
+    """
+    if stats is None:
+        stats = SearchStats()
+    board = analyse_level(game, stats, patterns)
+    stats.phase("recherche")
+    pushes = search(board, stats)
+    stats.phase("reconstruction")
+    moves = board.expand_pushes(game.player, game.boxes, pushes) if pushes else []
+    stats.finish()
+    return moves
+
+
+def bfs_solve(game, stats=None):
+    """Résout le puzzle par BFS sur les poussées (nombre de poussées minimal)
+
+    game doit fournir level_data, player et boxes (Game, Board ou
+    Position). stats, s'il est donné, est un SearchStats rempli pendant
+    la recherche (son rappel peut interrompre la recherche).
+    """
+    return run_search(game, stats,
+                  lambda board, stats: _bfs_pushes(board, game.player, game.boxes, stats))
+
+
+def _iddfs_pushes(board, player, boxes, max_depth, deadline, stats, max_table=200000):
+    """DFS à profondeur itérative sur les poussées, avec pile explicite
+
+    La table de transposition garde pour chaque état la plus petite
+    profondeur où il a été atteint pendant l'itération : on ne le
+    redéveloppe que si on y revient par un chemin plus court. Elle est
+    bornée à max_table états (au-delà, on n'ajoute plus rien). Une
+    macro-poussée (tunnel, salle d'objectifs) compte pour un seul niveau.
+    Renvoie les poussées, None s'il n'y a pas de solution, ou False si
+    l'heure limite deadline est dépassée.
+    """
+    bits = board.encode_boxes(boxes)
+    if bits == board.goal_bits:
+        return []
+    region = board.reachable(player, bits)
+    root = board.key(region, bits)
+
+    for limit in range(1, max_depth + 1):
+        table = {root: 0}
+        codes = []
+        stack = [board.macro_successors(bits, region, stats)]
+        cut = False
+
+        while stack:
+            push = next(stack[-1], None)
+            if push is None:
+                stack.pop()
+                if codes:
+                    codes.pop()
+                continue
+
+            new_player, code, _, new_bits = push
+            depth = len(stack)
+            stats.generated += 1
+            if new_bits == board.goal_bits:
+                codes.append(code)
+                stats.measure(table)
+                return board.decode_pushes(codes)
+            if depth >= limit:
+                cut = True
+                continue
+
+            new_region = board.reachable(new_player, new_bits)
+            state = board.key(new_region, new_bits)
+            seen = table.get(state)
+            if seen is not None and seen <= depth:
+                stats.duplicates += 1
+                continue
+            if seen is not None or len(table) < max_table:
+                table[state] = depth
+
+            stats.reach(depth)
+            stats.frontier(depth)
+            stats.expand()
+            if stats.expanded % PROGRESS_INTERVAL == 0 and time.time() > deadline:
+                return False
+            codes.append(code)
+            stack.append(board.macro_successors(new_bits, new_region, stats))
+
+        # Aucune branche coupée par la limite : tout a été exploré
+        if not cut:
+            stats.measure(table)
+            return None
+
+    return None
+
+
+def dfs_solve(game, max_depth=300, timeout_seconds=5, stats=None):
+    """Résout le puzzle par DFS à profondeur itérative sur les poussées
+
+    max_depth est le nombre maximal de poussées, une macro-poussée
+    comptant pour une. Après timeout_seconds
+    secondes sans solution, renvoie une liste vide.
+    """
+    def search(board, stats):
+        print(f"DFS: Recherche avec timeout de {timeout_seconds}s...")
+        pushes = _iddfs_pushes(board, game.player, game.boxes, max_depth,
+                               time.time() + timeout_seconds, stats)
+        if pushes is False:
+            print(f"DFS: Timeout après {timeout_seconds}s")
+        elif pushes is None:
+            print("DFS: Aucune solution trouvée")
+        else:
+            print(f"DFS: Solution trouvée en {len(pushes)} poussées")
+        return pushes
+
+    return run_search(game, stats, search)
+
+
+def _astar_pushes(board, player, boxes, max_states, stats, weight=1, bound=INF):
+    """A* sur les poussées ; renvoie les poussées, None, ou False si
+    le nombre d'états dépasse max_states
+
+    Avec weight > 1 (A* pondéré, f = g + weight * h), la solution est
+    trouvée plus vite mais n'est plus forcément la plus courte. Seules
+    les solutions de moins de bound poussées sont cherchées.
+    """
+    bits = board.encode_boxes(boxes)
+    h = board.heuristic(bits)
+    if h is None or h >= bound:
+        return None
+    counter = itertools.count()
+    best_g = {board.key(board.reachable(player, bits), bits): 0}
+    arena = NodeArena()
+    # (f, h, ordre d'insertion, g, caisses, joueur, nœud)
+    heap = [(weight * h, h, next(counter), 0, bits, player, 0)]
+
+    while heap:
+        stats.frontier(len(heap))
+        _, h, _, g, bits, player, node = heapq.heappop(heap)
+        if bits == board.goal_bits:
+            stats.measure(best_g, arena)
+            return board.decode_pushes(arena.path(node))
+        region = board.reachable(player, bits)
+        if best_g.get(board.key(region, bits), INF) < g:
+            continue  # Déjà atteint par un chemin plus court
+        stats.reach(g)
+        stats.expand()
+
+        for new_player, code, cost, new_bits in board.macro_successors(bits, region, stats):
+            stats.generated += 1
+            new_g = g + cost
+            state = board.key(board.reachable(new_player, new_bits), new_bits)
+            if best_g.get(state, INF) <= new_g:
+                stats.duplicates += 1
+                continue
+            new_h = board.heuristic(new_bits)
+            if new_h is None or new_g + new_h >= bound:
+                stats.pruned += 1
+                continue
+            best_g[state] = new_g
+            child = arena.add(node, code)
+            heapq.heappush(heap, (new_g + weight * new_h, new_h, next(counter), new_g,
+                                  new_bits, new_player, child))
+        if len(best_g) > max_states:
+            stats.measure(best_g, arena)
+            return False
+
+    stats.measure(best_g, arena)
+    return None
+
+
+def _ida_pushes(board, player, boxes, stats, max_table=200000):
+    """IDA* sur les poussées, avec pile explicite : mémoire proportionnelle
+    à la profondeur
+
+    Une table bornée des coûts déjà vus dans l'itération courante évite
+    de ré-explorer les transpositions.
+    """
+    bits = board.encode_boxes(boxes)
+    h = board.heuristic(bits)
+    if h is None:
+        return None
+    if bits == board.goal_bits:
+        return []
+    region = board.reachable(player, bits)
+    root = board.key(region, bits)
+
+    threshold = h
+    while True:
+        table = {root: 0}
+        codes = []
+        minimum = INF  # Plus petit f au-delà du seuil, prochain seuil
+        stats.reach(0)
+        stats.frontier(0)
+        stats.expand()
+        stack = [(board.macro_successors(bits, region, stats), 0)]
+
+        while stack:
+            successors, g = stack[-1]
+            push = next(successors, None)
+            if push is None:
+                stack.pop()
+                if codes:
+                    codes.pop()
+                continue
+
+            new_player, code, cost, new_bits = push
+            stats.generated += 1
+            new_g = g + cost
+            new_region = board.reachable(new_player, new_bits)
+            state = board.key(new_region, new_bits)
+            if table.get(state, INF) <= new_g:
+                stats.duplicates += 1
+                continue
+            new_h = board.heuristic(new_bits)
+            if new_h is None:
+                stats.pruned += 1
+                continue
+            if len(table) < max_table or state in table:
+                table[state] = new_g
+            if new_g + new_h > threshold:
+                minimum = min(minimum, new_g + new_h)
+                continue
+            if new_bits == board.goal_bits:
+                codes.append(code)
+                stats.measure(table)
+                return board.decode_pushes(codes)
+
+            stats.reach(new_g)
+            stats.frontier(new_g)
+            stats.expand()
+            codes.append(code)
+            stack.append((board.macro_successors(new_bits, new_region, stats), new_g))
+
+        if minimum >= INF:
+            stats.measure(table)
+            return None
+        threshold = minimum
+
+
+def astar_solve(game, max_states=300000, stats=None):
+    """Résout le puzzle par A* (nombre de poussées minimal)
+
+    Si A* dépasse max_states états en mémoire, la recherche repart
+    en IDA*, plus lent mais à mémoire bornée.
+    """
+    def search(board, stats):
+        pushes = _astar_pushes(board, game.player, game.boxes, max_states, stats)
+        if pushes is False:
+            print(f"A*: plus de {max_states} états - passage à IDA*")
+            stats.phase("recherche IDA*")
+            pushes = _ida_pushes(board, game.player, game.boxes, stats)
+        return pushes
+
+    return run_search(game, stats, search, patterns=True)
+
+
+def _anytime_pushes(board, player, boxes, max_states, stats, weights=ANYTIME_WEIGHTS):
+    """Générateur : des poussées de plus en plus courtes
+
+    Un A* pondéré par chaque poids, du plus grand au plus petit, ne
+    cherche que des solutions plus courtes que la meilleure connue. Le
+    dernier poids est 1 : la dernière solution donnée est alors la plus
+    courte, sauf si max_states est dépassé.
+    """
+    bits = board.encode_boxes(boxes)
+    if bits == board.goal_bits:
+        yield []
+        return
+    best = None
+    for weight in weights:
+        pushes = _astar_pushes(board, player, boxes, max_states, stats, weight,
+                               INF if best is None else len(best))
+        if pushes:
+            best = pushes
+            yield pushes
+        elif pushes is False and weight == 1 and best is None:
+            print(f"Anytime: plus de {max_states} états - passage à IDA*")
+            stats.phase("recherche IDA*")
+            pushes = _ida_pushes(board, player, boxes, stats)
+            if pushes:
+                yield pushes
+
+
+def anytime_solve(game, max_states=300000, stats=None):
+    """Générateur : une première solution très vite, puis des solutions
+    de plus en plus courtes
+
+    Chaque liste de mouvements produite a moins de poussées que la
+    précédente ; la dernière a le nombre de poussées minimal (sauf si
+    A* dépasse max_states états). On peut jouer la première solution
+    sans attendre les suivantes.
+    """
+    if stats is None:
+        stats = SearchStats()
+    board = analyse_level(game, stats, patterns=True)
+    stats.phase("recherche")
+    for pushes in _anytime_pushes(board, game.player, game.boxes, max_states, stats):
+        stats.phase("reconstruction")
+        moves = board.expand_pushes(game.player, game.boxes, pushes)
+        stats.phase("recherche")
+        yield moves
+    stats.finish()
+
+
+def _bidirectional_pushes(board, player, boxes, stats):
+    """BFS bidirectionnel : poussées depuis le départ, tirages depuis les
+    objectifs, jusqu'à ce que les deux frontières se rencontrent
+
+    On développe à chaque tour la couche la plus petite des deux.
+    """
+    bits = board.encode_boxes(boxes)
+    if bits == board.goal_bits:
+        return []
+
+    forward_arena = NodeArena()
+    forward = {board.key(board.reachable(player, bits), bits): 0}
+    forward_layer = [(bits, player, 0)]
+
+    # Départs arrière : caisses sur les objectifs, joueur dans chaque zone
+    backward_arena = NodeArena()
+    backward = {}
+    backward_layer = []
+    for cell in board.goal_regions():
+        key = board.key(board.reachable(cell, board.goal_bits), board.goal_bits)
+        if key not in backward:
+            node = 0 if not backward else backward_arena.add_root()
+            backward[key] = node
+            backward_layer.append((board.goal_bits, cell, node))
+
+    def splice(forward_node, backward_node):
+        # Le chemin arrière est stocké sous forme des poussées inverses
+        stats.measure(forward, forward_arena)
+        codes = forward_arena.path(forward_node)
+        codes += reversed(backward_arena.path(backward_node))
+        return board.decode_pushes(codes)
+
+    start_key = next(iter(forward))
+    if start_key in backward:
+        return splice(0, backward[start_key])
+
+    depth = 0
+    while forward_layer and backward_layer:
+        stats.frontier(len(forward_layer) + len(backward_layer))
+        depth += 1
+        stats.reach(depth)
+        next_layer = []
+        if len(forward_layer) <= len(backward_layer):
+            for bits, player, node in forward_layer:
+                stats.expand()
+                region = board.reachable(player, bits)
+                for box, move, new_bits in board.successors(bits, region, stats):
+                    stats.generated += 1
+                    state = board.key(board.reachable(box, new_bits), new_bits)
+                    if state in forward:
+                        stats.duplicates += 1
+                        continue
+                    child = forward_arena.add(node, board.push_code(box, move))
+                    if state in backward:
+                        return splice(child, backward[state])
+                    forward[state] = child
+                    next_layer.append((new_bits, box, child))
+            forward_layer = next_layer
+        else:
+            for bits, player, node in backward_layer:
+                stats.expand()
+                region = board.reachable(player, bits)
+                for box, (dx, dy), new_bits, new_player in board.pulls(bits, region):
+                    stats.generated += 1
+                    state = board.key(board.reachable(new_player, new_bits), new_bits)
+                    if state in backward:
+                        stats.duplicates += 1
+                        continue
+                    # En marche avant : la caisse, arrivée à côté, est repoussée
+                    pulled_to = (box[0] + dx, box[1] + dy)
+                    child = backward_arena.add(node, board.push_code(pulled_to, (-dx, -dy)))
+                    if state in forward:
+                        return splice(forward[state], child)
+                    backward[state] = child
+                    next_layer.append((new_bits, new_player, child))
+            backward_layer = next_layer
+
+    stats.measure(forward, forward_arena)
+    return None
+
+
+def bidirectional_solve(game, stats=None):
+    """Résout le puzzle en cherchant à la fois depuis le départ (poussées)
+    et depuis les objectifs (tirages)"""
+    return run_search(game, stats,
+                  lambda board, stats: _bidirectional_pushes(board, game.player, game.boxes, stats))
+
+
+# Solveur associé à chaque nom d'algorithme (menu du jeu, ligne de commande).
+# anytime_solve est un générateur de solutions de plus en plus courtes.
+SOLVERS = {
+    "BFS": bfs_solve,
+    "DFS": dfs_solve,
+    "A*": astar_solve,
+    "BIDIR": bidirectional_solve,
+    "ANYTIME": anytime_solve,
+}
+
+
+class SolverJob:
+    """Résolution lancée dans un thread, pour ne pas bloquer l'affichage
+
+    Le solveur travaille sur une copie de la position. On suit son
+    avancement avec stats (SearchStats) et elapsed, done indique la fin,
+    result contient alors la liste des mouvements ([] si aucune solution
+    ou annulé). cancel interrompt la recherche au prochain rappel.
+
+    Si le solveur est un générateur (anytime_solve), result prend chaque
+    nouvelle solution dès qu'elle arrive et solutions les compte.
+    """
+
+    def __init__(self, solver, game):
+        self.position = Position(game.level_data, game.player, game.boxes)
+        self.stats = SearchStats(self._progress)
+        self.start_time = time.time()
+        self.end_time = None
+        self.result = []
+        self.solutions = 0
+        self.cancelled = False
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(solver,), daemon=True)
+        self._thread.start()
+
+    def _progress(self, stats):
+        if self._cancel.is_set():
+            raise SolverCancelled()
+        time.sleep(0)  # Laisser la main au thread de l'interface
+
+    def _run(self, solver):
+        try:
+            result = solver(self.position, stats=self.stats)
+            if isinstance(result, list):
+                self.result = result
+            else:
+                for moves in result:
+                    self.result = moves
+                    self.solutions += 1
+        except SolverCancelled:
+            self.cancelled = True
+        except MemoryError:
+            print("Solveur: mémoire insuffisante")
+        finally:
+            self.stats.finish()
+            self.end_time = time.time()
+
+    @property
+    def nodes(self):
+        return self.stats.expanded
+
+    @property
+    def done(self):
+        return self.end_time is not None
+
+    @property
+    def elapsed(self):
+        return (self.end_time or time.time()) - self.start_time
+
+    def cancel(self):
+        """Demande l'arrêt de la recherche"""
+        self._cancel.set()
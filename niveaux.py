@@ -0,0 +1,39 @@
+"""Niveaux intégrés au jeu (une liste de lignes par niveau)"""
+
+# Niveaux progressifs
+levels = [
+    # Niveau 1 - Très facile
+    [
+        "########",
+        "#      #",
+        "# $  . #",
+        "#   P  #",
+        "#      #",
+        "########",
+    ],
+    
+    # Niveau 2 - Facile
+    [
+        "##########",
+        "##      ##",
+        "## $    ##",
+        "##     P##",
+        "##      ##",
+        "####  ####",
+        "##### ####",
+        "##      ##",
+        "### .  ###",
+        "##########",
+    ],
+    
+    # Niveau 3 - Moyen
+    [
+        "############",
+        "#     #    #",
+        "# $   #  . #",
+        "## #  #  # #",
+        "#     P    #",
+        "#   $    . #",
+        "############",
+    ],
+]
@@ -0,0 +1,156 @@
+"""Résolution en lot, sans interface graphique.
+
+Résout une liste de niveaux en parallèle sur tous les cœurs et écrit une
+ligne JSON par niveau (solution, longueur, nœuds développés, durée et
+statistiques de la recherche). Les messages des solveurs vont sur la
+sortie d'erreur : la sortie standard ne contient que les lignes JSON.
+
+    python resoudre.py                      # niveaux intégrés
+    python resoudre.py 1 3 --solver A*      # niveaux intégrés 1 et 3
+    python resoudre.py recueil.xsb --timeout 30 --memory 1024
+    python resoudre.py recueil.xsb:120      # seulement le niveau 120
+    python resoudre.py recueil.xsb:7 --solver BFS-PAR --workers 32
+    python resoudre.py recueil.xsb:7 --solver BFS-DISQUE --memory 512
+
+Avec BFS-PAR, chaque niveau est réparti sur tous les processus : les
+niveaux sont alors résolus l'un après l'autre. BFS-DISQUE garde ses
+états sur disque et limite sa mémoire à la moitié de --memory.
+
+Les fichiers de niveaux sont au format standard .xsb / .sok, lus avec
+collection_niveaux.LevelCollection.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+from bfs_disque import DEFAULT_MEMORY_MB, external_bfs_solve
+from bfs_parallele import parallel_bfs_solve
+from collection_niveaux import LevelCollection
+from moteur import SOLVERS, Board, SearchStats, SolverCancelled, dfs_solve, moves_to_lurd
+from niveaux import levels
+
+try:
+    import resource
+except ImportError:  # Windows : pas de limite mémoire
+    resource = None
+
+# Solveurs du jeu plus le BFS réparti sur plusieurs cœurs et le BFS sur disque
+CLI_SOLVERS = dict(SOLVERS, **{"BFS-PAR": parallel_bfs_solve,
+                               "BFS-DISQUE": external_bfs_solve})
+
+
+def collect_levels(specs):
+    """Liste de (nom, lignes) à partir des arguments de la ligne de commande"""
+    if not specs:
+        return [(f"intégré:{i + 1}", level) for i, level in enumerate(levels)]
+    tasks = []
+    for spec in specs:
+        path, _, number = spec.rpartition(':')
+        if spec.isdigit():
+            tasks.append((f"intégré:{spec}", levels[int(spec) - 1]))
+        elif path and number.isdigit():
+            tasks.append((spec, LevelCollection(path)[int(number) - 1]))
+        else:
+            for i, level in enumerate(LevelCollection(spec)):
+                tasks.append((f"{spec}:{i + 1}", level))
+    return tasks
+
+
+def _limit_memory(memory_mb):
+    """Initialisation d'un processus de travail : plafond de mémoire"""
+    if resource is not None and memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def solve_one(name, level_data, solver_name, timeout, workers=None, memory_mb=0):
+    """Résout un niveau dans un processus de travail, renvoie un dict
+
+    Les messages des solveurs sont redirigés vers la sortie d'erreur.
+    """
+    start_time = time.time()
+
+    def check_timeout(stats):
+        if time.time() - start_time > timeout:
+            raise SolverCancelled()
+
+    stats = SearchStats(check_timeout)
+
+    status = "résolu"
+    moves = []
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            solver = CLI_SOLVERS[solver_name]
+            if solver is parallel_bfs_solve:
+                solver = partial(solver, workers=workers)
+            elif solver is dfs_solve:
+                # Le DFS a sa propre limite de temps (5 s par défaut)
+                solver = partial(solver, timeout_seconds=timeout)
+            elif solver is external_bfs_solve:
+                # L'autre moitié reste pour le niveau, les fichiers lus par mmap...
+                solver = partial(solver, memory_mb=memory_mb // 2 or DEFAULT_MEMORY_MB)
+            result = solver(Board.for_level(level_data), stats=stats)
+            if isinstance(result, list):
+                moves = result
+            else:
+                # Solveur anytime : on garde la dernière solution, la plus courte
+                for moves in result:
+                    pass
+            if not moves:
+                status = "sans solution"
+        except SolverCancelled:
+            # Le solveur anytime a pu donner une solution avant la limite
+            status = "résolu" if moves else "temps dépassé"
+        except MemoryError:
+            status = "mémoire dépassée"
+
+    return {
+        'level': name,
+        'solver': solver_name,
+        'status': status,
+        'solution': moves_to_lurd(moves),
+        'length': len(moves),
+        'nodes': stats.expanded,
+        'time': round(time.time() - start_time, 3),
+        'stats': stats.as_dict(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Résolution de niveaux Sokoban en lot")
+    parser.add_argument('levels', nargs='*',
+                        help="numéros de niveaux intégrés ou fichiers de niveaux")
+    parser.add_argument('--solver', choices=sorted(CLI_SOLVERS), default="A*")
+    parser.add_argument('--timeout', type=float, default=60,
+                        help="temps maximal par niveau, en secondes")
+    parser.add_argument('--memory', type=int, default=0,
+                        help="mémoire maximale par processus, en Mo (0 : pas de limite)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="nombre de processus (par défaut : tous les cœurs)")
+    args = parser.parse_args(argv)
+
+    tasks = collect_levels(args.levels)
+    # BFS-PAR lance ses propres processus : un seul niveau à la fois
+    parallel = args.solver == "BFS-PAR"
+    with ProcessPoolExecutor(max_workers=1 if parallel else args.workers,
+                             initializer=_limit_memory,
+                             initargs=(args.memory,)) as pool:
+        futures = {pool.submit(solve_one, name, level, args.solver, args.timeout,
+                               args.workers, args.memory): name
+                   for name, level in tasks}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:  # Processus tué (mémoire système...)
+                result = {'level': futures[future], 'solver': args.solver,
+                          'status': "erreur", 'error': str(e)}
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
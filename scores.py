@@ -0,0 +1,118 @@
+"""Tableau des scores, stocké dans une base SQLite locale.
+
+Chaque partie ajoute une ligne : rien n'est relu ni réécrit à la
+sauvegarde. Les index permettent d'obtenir les meilleurs scores (par
+niveau atteint, algorithme ou date) sans parcourir toute la table.
+L'ancien fichier texte scores.txt est importé à la création de la base.
+"""
+import os
+import sqlite3
+from datetime import datetime
+
+SCORES_DB = "scores.db"
+LEGACY_FILE = "scores.txt"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    level_reached INTEGER NOT NULL,
+    completed_all INTEGER NOT NULL,
+    algorithm TEXT NOT NULL,
+    date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_rank ON scores (level_reached DESC, date);
+CREATE INDEX IF NOT EXISTS scores_algorithm ON scores (algorithm, level_reached DESC, date);
+CREATE INDEX IF NOT EXISTS scores_date ON scores (date);
+"""
+
+
+def parse_legacy_line(line, level_count):
+    """Score d'une ligne de l'ancien fichier texte, ou None
+
+    Format : « nom - statut - algorithme - date » ; les plus anciennes
+    lignes n'ont pas d'algorithme (BFS par défaut).
+    """
+    parts = line.strip().split(' - ')
+    if len(parts) < 3:
+        return None
+    name, status = parts[0], parts[1]
+    if len(parts) >= 4:
+        algorithm, date = parts[2], parts[3]
+    else:
+        algorithm, date = 'BFS', parts[2]
+    completed_all = "VICTOIRE TOTALE" in status
+    if completed_all:
+        level_reached = level_count
+    else:
+        try:
+            level_reached = int(status.split()[1])
+        except (IndexError, ValueError):
+            level_reached = 1
+    return {'name': name, 'level_reached': level_reached,
+            'completed_all': completed_all, 'algorithm': algorithm, 'date': date}
+
+
+class ScoreStore:
+    """Scores des joueurs : ajout en fin de table et requêtes indexées"""
+
+    def __init__(self, path=SCORES_DB, legacy_file=LEGACY_FILE, level_count=1):
+        created = not os.path.exists(path)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(_SCHEMA)
+        if created and legacy_file and os.path.exists(legacy_file):
+            self._import_legacy(legacy_file, level_count)
+
+    def _import_legacy(self, legacy_file, level_count):
+        with open(legacy_file, 'r', encoding='utf-8') as f:
+            rows = [score for score in (parse_legacy_line(line, level_count) for line in f)
+                    if score is not None]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO scores (name, level_reached, completed_all, algorithm, date) "
+                "VALUES (:name, :level_reached, :completed_all, :algorithm, :date)", rows)
+        print(f"{len(rows)} scores importés depuis {legacy_file}")
+
+    def add(self, name, level_reached, completed_all=False, algorithm='BFS', date=None):
+        """Ajoute le score d'une partie"""
+        date = date or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO scores (name, level_reached, completed_all, algorithm, date) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (name, level_reached, int(completed_all), algorithm, date))
+
+    def top(self, k=10, algorithm=None, min_level=None, since=None, until=None):
+        """Les k meilleurs scores, du niveau le plus haut au plus bas
+
+        À niveau égal, le premier arrivé passe devant. Les filtres sont
+        facultatifs : algorithme, niveau minimal atteint et période
+        (dates au format « AAAA-MM-JJ HH:MM:SS », bornes incluses).
+        """
+        conditions, parameters = [], []
+        if algorithm is not None:
+            conditions.append("algorithm = ?")
+            parameters.append(algorithm)
+        if min_level is not None:
+            conditions.append("level_reached >= ?")
+            parameters.append(min_level)
+        if since is not None:
+            conditions.append("date >= ?")
+            parameters.append(since)
+        if until is not None:
+            conditions.append("date <= ?")
+            parameters.append(until)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        rows = self.connection.execute(
+            "SELECT name, level_reached, completed_all, algorithm, date FROM scores "
+            f"{where}ORDER BY level_reached DESC, date LIMIT ?", parameters + [k])
+        return [{'name': name, 'level_reached': level, 'completed_all': bool(completed),
+                 'algorithm': algo, 'date': date}
+                for name, level, completed, algo, date in rows]
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,93 @@
+"""Comportement du modèle de jeu (moteur.Game), sans interface."""
+import os
+import subprocess
+import sys
+
+from moteur import Game
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Une caisse à pousser deux fois vers la droite
+LEVEL = [
+    "#######",
+    "#     #",
+    "#P$ . #",
+    "#     #",
+    "#######",
+]
+
+
+class RecordingGame(Game):
+    """Partie qui note les appels aux points d'extension"""
+
+    def __init__(self, levels):
+        self.events = []
+        super().__init__(levels)
+
+    def on_push(self):
+        self.events.append("poussée")
+
+    def on_solved(self):
+        self.events.append("victoire")
+
+
+def test_first_move_can_be_undone():
+    game = Game([LEVEL])
+    start = game.get_state()
+    assert game.move(1, 0)
+    assert game.undo_move()
+    assert game.get_state() == start
+    assert not game.undo_move()
+
+
+def test_undo_and_redo_a_push():
+    game = Game([LEVEL])
+    game.move(1, 0)
+    pushed = game.get_state()
+    assert game.boxes == {(3, 2)}
+    game.undo_move()
+    assert game.boxes == {(2, 2)} and game.player == (1, 2)
+    assert game.redo_move()
+    assert game.get_state() == pushed
+    assert not game.redo_move()
+
+
+def test_new_move_clears_redo():
+    game = Game([LEVEL])
+    game.move(1, 0)
+    game.undo_move()
+    game.move(0, 1)
+    assert not game.redo_move()
+
+
+def test_blocked_moves_leave_no_history():
+    game = Game([LEVEL])
+    assert not game.move(-1, 0)  # Mur
+    game.move(1, 0)
+    game.move(1, 0)
+    game.move(0, -1)
+    game.move(1, 0)
+    game.move(0, 1)
+    assert not game.move(0, 1)  # Caisse contre le mur
+    assert len(game.history) == 5
+
+
+def test_hooks_and_victory_reported_once():
+    game = RecordingGame([LEVEL])
+    game.move(1, 0)
+    assert not game.is_solved()
+    game.move(1, 0)
+    assert game.is_solved() and game.is_solved()
+    assert game.events == ["poussée", "poussée", "victoire"]
+    assert game.export_moves() == "2R"
+
+
+def test_move_silent_keeps_history_empty():
+    game = RecordingGame([LEVEL])
+    assert game.move_silent(1, 0)
+    assert not game.history and not game.events
+
+
+def test_moteur_import_does_not_load_pygame():
+    code = "import sys, moteur; sys.exit('pygame' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=ROOT).returncode == 0